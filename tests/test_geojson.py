@@ -0,0 +1,51 @@
+"""Tests for the GeoJSON writing utilities (traffic_sim_module.utils.geojson)."""
+
+import json
+
+import pytest
+
+from traffic_sim_module.utils import geojson
+from traffic_sim_module.utils.geojson import (
+    FEATURE_COLLECTION_FOOTER,
+    FEATURE_COLLECTION_HEADER,
+    dumps_features,
+)
+
+FEATURES = [
+    {'type': 'Feature',
+     'geometry': {'type': 'Point', 'coordinates': [8.54, 47.37]},
+     'properties': {'person': 'A', 'time': 27500}},
+    # Members in a different order, and a property value that looks like a
+    # feature boundary once encoded
+    {'properties': {'note': '},{"type":"Feature",', 'nested': {'type': 'Feature'}},
+     'geometry': {'type': 'Point', 'coordinates': [8.55, 47.38]},
+     'type': 'Feature'},
+    {'type': 'Feature', 'geometry': None, 'properties': {}},
+]
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    """Run a test with orjson (if installed) and with the json fallback."""
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(geojson, 'orjson', None)
+    return request.param
+
+
+def test_feature_collection_round_trip(encoder):
+    data = FEATURE_COLLECTION_HEADER + dumps_features(FEATURES) + FEATURE_COLLECTION_FOOTER
+
+    assert json.loads(data)['features'] == FEATURES
+
+
+@pytest.mark.parametrize('separator', [b',\n', b'\n'])
+def test_one_feature_per_separator(encoder, separator):
+    parts = dumps_features(FEATURES, separator).split(separator)
+
+    assert [json.loads(part) for part in parts] == FEATURES
+
+
+def test_no_features(encoder):
+    assert dumps_features([]) == b''
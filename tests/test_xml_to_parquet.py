@@ -0,0 +1,119 @@
+"""Tests for the XML to Parquet converter (traffic_sim_module.pipeline.xml_to_parquet)."""
+
+from collections import defaultdict
+import gzip
+
+import pyarrow.parquet as pq
+import pytest
+
+from traffic_sim_module.pipeline.xml_to_parquet import (
+    STOP_CHECK_INTERVAL,
+    filter_events_chunk,
+    iter_event_chunks,
+    xml_to_parquet_filtered,
+)
+
+TIME_INTERVALS = [(27000, 28000)]
+VALID_LINKS = {'1001', '1002'}
+
+
+def write_events(path, events):
+    """Write (time, type, person, link) tuples as a MATSim events file."""
+    lines = ['<?xml version="1.0" encoding="utf-8"?>', '<events version="1.0">']
+    lines += [f'\t<event time="{time}" type="{event_type}" person="{person}" link="{link}" />'
+              for time, event_type, person, link in events]
+    lines.append('</events>')
+    data = '\n'.join(lines).encode()
+    if str(path).endswith('.gz'):
+        with gzip.open(path, 'wb') as f:
+            f.write(data)
+    else:
+        path.write_bytes(data)
+
+
+def traffic(start, end, step=10):
+    """Short trips of other vehicles on link 1002, one every step seconds."""
+    events = []
+    for i, time in enumerate(range(start, end, step)):
+        events.append((time, 'EnterLink', f'car{i}', '1002'))
+        events.append((time + 5, 'LeaveLink', f'car{i}', '1002'))
+    return events
+
+
+@pytest.fixture
+def long_stay_events():
+    """Person A stays on link 1001 for more than 6 h, from inside the interval
+    until well past its end; person B enters the link and never leaves."""
+    events = traffic(26000, 70000)
+    events += [
+        (27500, 'EnterLink', 'A', '1001'),
+        (27600, 'EnterLink', 'B', '1001'),
+        (50000, 'LeaveLink', 'A', '1001'),
+    ]
+    return sorted(events, key=lambda event: event[0])
+
+
+@pytest.mark.parametrize('file_name', ['events.xml', 'events.xml.gz'])
+def test_stay_longer_than_four_hours_is_clipped(tmp_path, long_stay_events, file_name):
+    xml_path = tmp_path / file_name
+    output_path = tmp_path / 'filtered.parquet'
+    write_events(xml_path, long_stay_events)
+
+    xml_to_parquet_filtered(xml_path, VALID_LINKS, output_path, TIME_INTERVALS,
+                            num_workers=4, chunk_size=500)
+
+    rows = pq.read_table(output_path).to_pylist()
+    stays = [row for row in rows if row['link_id'] == '1001']
+    assert [(row['person'], row['time_enter'], row['time_leave']) for row in stays] == [
+        ('A', 27500, 28000)
+    ]
+    # Everything entering within the interval is kept, nothing else
+    assert len(rows) == 1 + sum(27000 <= time <= 28000 for time in range(26000, 70000, 10))
+    assert [row['time_enter'] for row in rows] == sorted(row['time_enter'] for row in rows)
+
+
+def test_parsing_waits_for_leave_link_of_interval_enters(tmp_path, long_stay_events):
+    # Without B, whose EnterLink keeps parsing going to the end of the file
+    xml_path = tmp_path / 'events.xml'
+    write_events(xml_path, [event for event in long_stay_events if event[2] != 'B'])
+
+    parse_state = {'stopped': False}
+    chunks = list(iter_event_chunks(str(xml_path), 500, defaultdict(list),
+                                    valid_links=VALID_LINKS, time_intervals=TIME_INTERVALS,
+                                    parse_state=parse_state))
+    times = [int(time) for chunk in chunks for time in chunk[3]]
+
+    # Parsing continues to A's LeaveLink, then stops within one check interval
+    assert parse_state['stopped']
+    assert 50000 in times
+    assert max(times) < 50000 + STOP_CHECK_INTERVAL * 10
+
+
+def test_parsing_stops_after_last_interval(tmp_path):
+    xml_path = tmp_path / 'events.xml'
+    write_events(xml_path, traffic(26000, 70000))
+
+    parse_state = {'stopped': False}
+    chunks = list(iter_event_chunks(str(xml_path), 500, defaultdict(list),
+                                    valid_links=VALID_LINKS, time_intervals=TIME_INTERVALS,
+                                    parse_state=parse_state))
+
+    assert parse_state['stopped']
+    assert max(int(time) for chunk in chunks for time in chunk[3]) < 28000 + STOP_CHECK_INTERVAL * 10
+
+
+@pytest.mark.parametrize('enter_time, leave_time, expected', [
+    ('27500', '27600', [(27500, 27600)]),
+    ('27500.0', '27600.0', [(27500, 27600)]),  # MATSim writes integral times as N.0
+    ('27500.0', '29000.00', [(27500, 28000)]),
+    ('27500.5', '27600.0', []),  # Fractional times are skipped
+    ('27500', '27600.5', []),
+    ('', '27600', []),
+    ('noon', '27600', []),
+])
+def test_event_time_formats(enter_time, leave_time, expected):
+    chunk = (['A', 'A'], ['1001', '1001'], ['EnterLink', 'LeaveLink'], [enter_time, leave_time])
+
+    trips = filter_events_chunk((VALID_LINKS, chunk, TIME_INTERVALS)).to_pylist()
+
+    assert [(trip['time_enter'], trip['time_leave']) for trip in trips] == expected
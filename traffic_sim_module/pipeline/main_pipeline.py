@@ -42,6 +42,7 @@ Note:
 
 import multiprocessing as mp
 from pathlib import Path
+import sys
 import time
 from typing import Optional
 
@@ -141,7 +142,12 @@ class ProcessingConfig(BaseModel):
     Attributes:
         num_workers: Number of parallel worker processes (defaults to CPU count)
         chunk_size: Number of events to process per chunk (default: 100000)
+        export_chunk_size: Events per chunk for trajectory export (default: None,
+            which falls back to chunk_size if that is set and otherwise
+            auto-tunes from event and worker count; see
+            resolve_export_chunk_size)
         output_formats: List of output formats for trajectory data
+        geojson_ndjson: Write trajectory GeoJSON as newline-delimited features (default: False)
         heatmap_enabled: Whether to generate heatmap outputs (default: False)
         heatmap_time_interval: Sampling interval for heatmap in seconds (default: 300)
         heatmap_output_formats: List of output formats for heatmap data
@@ -149,10 +155,19 @@ class ProcessingConfig(BaseModel):
     """
     num_workers: Optional[int] = Field(None, ge=1, description="Number of worker processes")
     chunk_size: int = Field(100000, ge=1000, description="Chunk size for processing")
+    export_chunk_size: Optional[int] = Field(
+        None,
+        ge=1000,
+        description="Chunk size for trajectory export (None = chunk_size if set, else auto-tune)"
+    )
     output_formats: list[str] = Field(
         default=["geojson"],
         description="Output formats: geojson, csv, parquet, geoparquet"
     )
+    geojson_ndjson: bool = Field(
+        False,
+        description="Write trajectory GeoJSON as newline-delimited features instead of a FeatureCollection"
+    )
     heatmap_enabled: bool = Field(False, description="Enable heatmap export with vehicle counts")
     heatmap_time_interval: int = Field(300, ge=60, description="Time interval for heatmap sampling (seconds)")
     heatmap_output_formats: list[str] = Field(
@@ -167,6 +182,19 @@ class ProcessingConfig(BaseModel):
         """Set default to CPU count if not specified."""
         return v if v is not None else mp.cpu_count()
 
+    def resolve_export_chunk_size(self) -> Optional[int]:
+        """Chunk size for trajectory export, or None to auto-tune.
+
+        Configs written before export_chunk_size existed tuned chunk_size for
+        both stages, so an explicitly set chunk_size still applies to the
+        export unless export_chunk_size overrides it.
+        """
+        if self.export_chunk_size is not None:
+            return self.export_chunk_size
+        if 'chunk_size' in self.model_fields_set:
+            return self.chunk_size
+        return None
+
     @field_validator('output_formats', 'heatmap_output_formats')
     @classmethod
     def validate_output_formats(cls, v: list[str]) -> list[str]:
@@ -253,7 +281,24 @@ def generate_snapshot_intervals(start_time: str, end_time: str,
     return intervals
 
 
-def print_config_summary(config: PipelineConfig):
+def get_mp_context():
+    """Return the multiprocessing context used for all pipeline worker pools.
+
+    On Linux the 'fork' start method is used so that workers inherit the
+    already-loaded network data (link attributes, valid link IDs) via
+    copy-on-write instead of unpickling their own copy. Other platforms use
+    'spawn', since forking is unsafe with macOS system libraries and not
+    available on Windows.
+
+    Returns:
+        multiprocessing context object
+    """
+    if sys.platform.startswith('linux'):
+        return mp.get_context('fork')
+    return mp.get_context('spawn')
+
+
+def print_config_summary(config: PipelineConfig, intervals: list[tuple[int, int]]):
     """Print comprehensive pipeline configuration summary to logs.
 
     Outputs a formatted summary of all pipeline parameters including file
@@ -261,63 +306,79 @@ def print_config_summary(config: PipelineConfig):
 
     Args:
         config: Validated pipeline configuration object
+        intervals: Snapshot intervals generated from the filter settings
 
     Note:
-        Uses logger.info for output, ensuring consistent formatting with
-        the rest of the pipeline logs.
+        The summary is emitted as a single multi-line logger.info message;
+        missing input files are additionally reported with logger.warning.
     """
-    logger.info("="*80)
-    logger.info("PIPELINE CONFIGURATION")
-    logger.info("="*80)
-
-    logger.info("Input Files:")
-    if config.paths.xml_input.exists():
-        size_mb = config.paths.xml_input.stat().st_size / (1024 * 1024)
-        logger.info(f"  XML Events: {config.paths.xml_input} ({size_mb:.2f} MB)")
-    else:
-        logger.warning(f"  XML Events: {config.paths.xml_input} (NOT FOUND)")
-
-    if config.paths.gpkg_network.exists():
-        size_mb = config.paths.gpkg_network.stat().st_size / (1024 * 1024)
-        logger.info(f"  Network GPKG: {config.paths.gpkg_network} ({size_mb:.2f} MB)")
+    lines = [
+        "="*80,
+        "PIPELINE CONFIGURATION",
+        "="*80,
+        "Input Files:",
+    ]
+    missing = []
+
+    for label, path in (("XML Events", config.paths.xml_input),
+                        ("Network GPKG", config.paths.gpkg_network)):
+        if path.exists():
+            size_mb = path.stat().st_size / (1024 * 1024)
+            lines.append(f"  {label}: {path} ({size_mb:.2f} MB)")
+        else:
+            lines.append(f"  {label}: {path} (NOT FOUND)")
+            missing.append(f"{label}: {path}")
+
+    lines += [
+        "Output Files:",
+        f"  Intermediate Parquet: {config.paths.parquet_intermediate}",
+        f"  Output base:          {config.paths.output_base}",
+        f"  Output formats:       {', '.join(config.processing.output_formats)}",
+    ]
+
+    if 'geojson' in config.processing.output_formats and config.processing.geojson_ndjson:
+        lines.append("  GeoJSON layout:       newline-delimited (NDJSON)")
+
+    export_chunk_size = config.processing.resolve_export_chunk_size()
+    if export_chunk_size is None:
+        export_chunk_size_label = "auto"
+    elif config.processing.export_chunk_size is None:
+        export_chunk_size_label = f"{export_chunk_size:,} (from chunk size)"
     else:
-        logger.warning(f"  Network GPKG: {config.paths.gpkg_network} (NOT FOUND)")
-
-    logger.info("Output Files:")
-    logger.info(f"  Intermediate Parquet: {config.paths.parquet_intermediate}")
-    logger.info(f"  Output base:          {config.paths.output_base}")
-    logger.info(f"  Output formats:       {', '.join(config.processing.output_formats)}")
-
-    logger.info("Filters:")
-    logger.info("  Snapshot mode:")
-    logger.info(f"    Period: {config.filters.start_time} - {config.filters.end_time}")
-    logger.info(f"    Frequency: every {config.filters.frequency_seconds}s")
-    logger.info(f"    Duration: {config.filters.duration_seconds}s per snapshot")
-
-    # Calculate how many intervals
-    intervals = generate_snapshot_intervals(
-        config.filters.start_time,
-        config.filters.end_time,
-        config.filters.frequency_seconds,
-        config.filters.duration_seconds
-    )
-    logger.info(f"    Total snapshots: {len(intervals)}")
-
-    logger.info("Processing:")
-    logger.info(f"  Workers:     {config.processing.num_workers}")
-    logger.info(f"  Chunk size:  {config.processing.chunk_size:,}")
+        export_chunk_size_label = f"{export_chunk_size:,}"
+
+    lines += [
+        "Filters:",
+        "  Snapshot mode:",
+        f"    Period: {config.filters.start_time} - {config.filters.end_time}",
+        f"    Frequency: every {config.filters.frequency_seconds}s",
+        f"    Duration: {config.filters.duration_seconds}s per snapshot",
+        f"    Total snapshots: {len(intervals)}",
+        "Processing:",
+        f"  Workers:     {config.processing.num_workers}",
+        f"  Chunk size:  {config.processing.chunk_size:,}",
+        f"  Export chunk size: {export_chunk_size_label}",
+    ]
 
     if config.processing.heatmap_enabled:
-        logger.info("Heatmap Export:")
-        logger.info("  Enabled:           True")
-        logger.info(f"  Time interval:     {config.processing.heatmap_time_interval}s")
-        logger.info(f"  Output base:       {config.processing.heatmap_output_base}")
-        logger.info(f"  Output formats:    {', '.join(config.processing.heatmap_output_formats)}")
-
-    logger.info("Pipeline Steps:")
-    logger.info(f"  Skip XML->Parquet:       {config.skip_xml_to_parquet}")
-    logger.info(f"  Skip Parquet->export:   {config.skip_parquet_to_export}")
-    logger.info("="*80)
+        lines += [
+            "Heatmap Export:",
+            "  Enabled:           True",
+            f"  Time interval:     {config.processing.heatmap_time_interval}s",
+            f"  Output base:       {config.processing.heatmap_output_base}",
+            f"  Output formats:    {', '.join(config.processing.heatmap_output_formats)}",
+        ]
+
+    lines += [
+        "Pipeline Steps:",
+        f"  Skip XML->Parquet:       {config.skip_xml_to_parquet}",
+        f"  Skip Parquet->export:   {config.skip_parquet_to_export}",
+        "="*80,
+    ]
+
+    logger.info("\n".join(lines))
+    for entry in missing:
+        logger.warning(f"Input file not found - {entry}")
 
 
 def main(config_path: str):
@@ -329,10 +390,11 @@ def main(config_path: str):
 
     Pipeline Execution Flow:
         1. Load and validate YAML configuration
-        2. Load road network with caching
-        3. Stage 1: Convert XML events to filtered Parquet (if not skipped)
-        4. Stage 2: Generate interpolated trajectories/animations (if not skipped)
-        5. Stage 3: Generate heatmap data (if enabled)
+        2. Run fast sanity checks (snapshot intervals, skipped-stage inputs)
+        3. Load road network with caching
+        4. Stage 1: Convert XML events to filtered Parquet (if not skipped)
+        5. Stage 2: Generate interpolated trajectories/animations (if not skipped)
+        6. Stage 3: Generate heatmap data (if enabled)
 
     Args:
         config_path: Path to YAML configuration file
@@ -360,11 +422,42 @@ def main(config_path: str):
         logger.error(f"Configuration validation failed: {e}")
         return 1
 
-    print_config_summary(config)
+    # Generate snapshot intervals once (used by the summary and Stage 1)
+    time_intervals = generate_snapshot_intervals(
+        config.filters.start_time,
+        config.filters.end_time,
+        config.filters.frequency_seconds,
+        config.filters.duration_seconds
+    )
+
+    print_config_summary(config, time_intervals)
+
+    # Fast validations first, so misconfigured runs fail before the network load
+    if not config.skip_xml_to_parquet and not time_intervals:
+        logger.error("No snapshot intervals fit in the configured time range")
+        return 1
+
+    if config.skip_xml_to_parquet and not config.paths.parquet_intermediate.exists():
+        logger.error(f"Parquet file does not exist: {config.paths.parquet_intermediate}")
+        return 1
 
-    # Load network once (used by both steps)
+    export_paths = [Path(f"{config.paths.output_base}.{fmt}") for fmt in config.processing.output_formats]
+    if config.skip_parquet_to_export:
+        missing = [path for path in export_paths if not path.exists()]
+        if missing:
+            logger.error(f"export file does not exist: {', '.join(map(str, missing))}")
+            return 1
+
+    if (config.skip_xml_to_parquet and config.skip_parquet_to_export
+            and not config.processing.heatmap_enabled):
+        logger.info("All pipeline steps skipped - nothing to do")
+        return 0
+
+    mp_context = get_mp_context()
+
+    # Load network once (used by all steps)
     logger.info("="*80)
-    logger.info("Loading road network (will be used by both pipeline steps)")
+    logger.info("Loading road network (will be used by all pipeline steps)")
     logger.info("="*80)
     start = time.time()
 
@@ -387,14 +480,6 @@ def main(config_path: str):
         logger.info("="*80)
         start = time.time()
 
-        # Generate time intervals from snapshot config
-        time_intervals = generate_snapshot_intervals(
-            config.filters.start_time,
-            config.filters.end_time,
-            config.filters.frequency_seconds,
-            config.filters.duration_seconds
-        )
-
         try:
             xml_to_parquet_filtered(
                 xml_input=str(config.paths.xml_input),
@@ -402,7 +487,8 @@ def main(config_path: str):
                 parquet_output=str(config.paths.parquet_intermediate),
                 time_intervals=time_intervals,
                 num_workers=config.processing.num_workers,
-                chunk_size=config.processing.chunk_size
+                chunk_size=config.processing.chunk_size,
+                mp_context=mp_context
             )
         except Exception as e:
             logger.error(f"Error in Step 1: {e}")
@@ -416,12 +502,8 @@ def main(config_path: str):
             logger.info(f"Output Parquet: {config.paths.parquet_intermediate} ({size_mb:.2f} MB)")
     else:
         logger.info("STEP 1: Skipped (using existing Parquet)")
-        if not config.paths.parquet_intermediate.exists():
-            logger.error(f"Parquet file does not exist: {config.paths.parquet_intermediate}")
-            return 1
-        if config.paths.parquet_intermediate.exists():
-            size_mb = config.paths.parquet_intermediate.stat().st_size / (1024 * 1024)
-            logger.info(f"Existing Parquet: {config.paths.parquet_intermediate} ({size_mb:.2f} MB)")
+        size_mb = config.paths.parquet_intermediate.stat().st_size / (1024 * 1024)
+        logger.info(f"Existing Parquet: {config.paths.parquet_intermediate} ({size_mb:.2f} MB)")
 
     # Step 2: Parquet -> export
     if not config.skip_parquet_to_export:
@@ -437,7 +519,9 @@ def main(config_path: str):
                 output_base=str(config.paths.output_base),
                 output_formats=config.processing.output_formats,
                 num_workers=config.processing.num_workers,
-                chunk_size=config.processing.chunk_size
+                chunk_size=config.processing.resolve_export_chunk_size(),
+                mp_context=mp_context,
+                geojson_ndjson=config.processing.geojson_ndjson
             )
         except Exception as e:
             logger.error(f"Error in Step 2: {e}")
@@ -446,17 +530,15 @@ def main(config_path: str):
 
         elapsed = time.time() - start
         logger.success(f"Step 2 completed in {elapsed:.2f} seconds ({elapsed/60:.1f} minutes)")
-        if config.paths.output_base.exists():
-            size_mb = config.paths.output_base.stat().st_size / (1024 * 1024)
-            logger.info(f"Output : {config.paths.output_base} ({size_mb:.2f} MB)")
+        for path in export_paths:
+            if path.exists():
+                size_mb = path.stat().st_size / (1024 * 1024)
+                logger.info(f"Output : {path} ({size_mb:.2f} MB)")
     else:
         logger.info("STEP 2: Skipped (using existing export)")
-        if not config.paths.output_base.exists():
-            logger.error(f"export file does not exist: {config.paths.output_base}")
-            return 1
-        if config.paths.output_base.exists():
-            size_mb = config.paths.output_base.stat().st_size / (1024 * 1024)
-            logger.info(f"Existing export: {config.paths.output_base} ({size_mb:.2f} MB)")
+        for path in export_paths:
+            size_mb = path.stat().st_size / (1024 * 1024)
+            logger.info(f"Existing export: {path} ({size_mb:.2f} MB)")
 
     # Step 3: Parquet -> Heatmap (optional)
     if config.processing.heatmap_enabled:
@@ -480,7 +562,8 @@ def main(config_path: str):
                 time_interval_seconds=config.processing.heatmap_time_interval,
                 start_time=start_sec,
                 end_time=end_sec,
-                num_workers=config.processing.num_workers
+                num_workers=config.processing.num_workers,
+                mp_context=mp_context
             )
         except Exception as e:
             logger.error(f"Error in Step 3 (Heatmap): {e}")
@@ -502,8 +585,6 @@ def main(config_path: str):
     return 0
 
 if __name__ == "__main__":
-    import sys
-
     if len(sys.argv) != 2:
         print("Usage: python main_pipeline.py <config.yaml>")
         sys.exit(1)
@@ -29,22 +29,38 @@ Example:
     ... )
 """
 
-import csv as csv_module
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import json
-import math
+from functools import partial
 import multiprocessing as mp
 from pathlib import Path
+import threading
 
-import geopandas as gpd
-import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 import pyarrow.parquet as pq
-from shapely.geometry import Point
 
 # Handle both module import and direct script execution
 try:
     from ..config import logger
-    from ..utils.network_cache import build_link_attributes_dict, load_network_cached
+    from ..utils.arrow_ipc import deserialize_batch, serialize_batch
+    from ..utils.geojson import (
+        FEATURE_COLLECTION_FOOTER,
+        FEATURE_COLLECTION_HEADER,
+        FEATURE_SEPARATOR,
+        dumps_features,
+    )
+    from ..utils.geoparquet import geoparquet_schema, points_to_wkb
+    from ..utils.network_cache import (
+        build_link_attributes_dict,
+        build_link_soa,
+        build_node_index,
+        calculate_bearings,
+        load_network_cached,
+    )
 except ImportError:
     # Running as standalone script - setup minimal logging
     from pathlib import Path
@@ -58,11 +74,64 @@ except ImportError:
     # Import from absolute path
     repo_root = Path(__file__).parent.parent.parent
     sys.path.insert(0, str(repo_root))
+    from traffic_sim_module.utils.arrow_ipc import deserialize_batch, serialize_batch
+    from traffic_sim_module.utils.geojson import (
+        FEATURE_COLLECTION_FOOTER,
+        FEATURE_COLLECTION_HEADER,
+        FEATURE_SEPARATOR,
+        dumps_features,
+    )
+    from traffic_sim_module.utils.geoparquet import geoparquet_schema, points_to_wkb
     from traffic_sim_module.utils.network_cache import (
         build_link_attributes_dict,
+        build_link_soa,
+        build_node_index,
+        calculate_bearings,
         load_network_cached,
     )
 
+# Schema of the interpolated trajectory point columns
+TRAJECTORY_SCHEMA = pa.schema([
+    ('x', pa.float64()),
+    ('y', pa.float64()),
+    ('timestamp', pa.string()),
+    ('angle', pa.int64()),
+    ('person_id', pa.string()),
+    ('interval_id', pa.int32()),
+])
+
+# Schema of the plain Parquet trajectory output. Coordinates are stored as
+# float32, which halves coordinate storage: in EPSG:4326 that resolves
+# about 4e-6 degrees (under 0.5 m) for values below 64 degrees and about
+# 1.5e-5 degrees (~1.7 m) near 180. GeoJSON, CSV and GeoParquet keep full
+# float64 coordinates.
+PARQUET_TRAJECTORY_SCHEMA = pa.schema([
+    pa.field(field.name, pa.float32()) if field.name in ('x', 'y') else field
+    for field in TRAJECTORY_SCHEMA
+])
+
+# Reference date for formatted trajectory timestamps (see time_to_timestamp)
+TIMESTAMP_BASE = np.datetime64('2024-01-01T00:00:00', 's')
+
+# Maximum number of processed chunks queued for the I/O thread
+MAX_PENDING_WRITES = 4
+
+# Compression codec for trajectory Parquet/GeoParquet output
+PARQUET_COMPRESSION = 'zstd'
+
+# Bounds for the auto-tuned export chunk size (events per chunk)
+MIN_CHUNK_SIZE = 2_000
+MAX_CHUNK_SIZE = 200_000
+
+# Display names of the output formats for log messages
+FORMAT_LABELS = {'geojson': 'GeoJSON', 'csv': 'CSV', 'parquet': 'Parquet', 'geoparquet': 'GeoParquet'}
+
+# Buffer size for text output files (fewer write syscalls on large exports)
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Event columns read from the filtered Parquet input
+EVENT_COLUMNS = ['person', 'link_id', 'time_enter', 'time_leave', 'interval_id']
+
 
 def load_network_with_cache(gpkg_path):
     """Load road network with automatic Parquet caching for faster subsequent loads.
@@ -107,6 +176,47 @@ def time_to_timestamp(seconds):
     return (base + timedelta(seconds=int(seconds))).strftime('%Y/%m/%d %H:%M:%S')
 
 
+def _format_timestamps(seconds):
+    """Format an array of seconds since midnight with NumPy datetime64."""
+    if len(seconds) == 0:
+        return np.array([], dtype='<U19')
+    times = TIMESTAMP_BASE + np.asarray(seconds, dtype=np.int64).astype('timedelta64[s]')
+    formatted = np.datetime_as_string(times, unit='s')
+    return np.char.replace(np.char.replace(formatted, '-', '/'), 'T', ' ')
+
+
+# Lookup table of formatted timestamps indexed by second, grown by whole days
+_timestamp_lut = np.array([], dtype='<U19')
+
+
+def time_to_timestamps(seconds):
+    """Vectorized version of time_to_timestamp for an array of seconds.
+
+    Timestamps are looked up in a per-process table of preformatted strings
+    covering whole simulated days, so each second is formatted only once.
+
+    Args:
+        seconds: Array of seconds since midnight
+
+    Returns:
+        NumPy string array of formatted timestamps ('YYYY/MM/DD HH:MM:SS')
+    """
+    global _timestamp_lut
+
+    seconds = np.asarray(seconds, dtype=np.int64)
+    if len(seconds) == 0:
+        return np.array([], dtype='<U19')
+    if seconds.min() < 0:
+        return _format_timestamps(seconds)
+
+    needed = int(seconds.max()) + 1
+    if needed > len(_timestamp_lut):
+        days = -(-needed // 86400)
+        _timestamp_lut = _format_timestamps(np.arange(days * 86400))
+
+    return _timestamp_lut[seconds]
+
+
 def calculate_bearing(start_coords, end_coords):
     """Calculate geographic bearing from start to end coordinates.
 
@@ -123,32 +233,25 @@ def calculate_bearing(start_coords, end_coords):
     Example:
         >>> calculate_bearing((40.7128, -74.0060), (51.5074, -0.1278))
         51  # Northeast direction from NYC to London
+
+    Note:
+        Scalar wrapper around network_cache.calculate_bearings, which computes
+        bearings for whole arrays of links at once.
     """
-    lat1, lon1 = map(math.radians, start_coords)
-    lat2, lon2 = map(math.radians, end_coords)
-    
-    delta_lon = lon2 - lon1
-    
-    x = math.cos(lat2) * math.sin(delta_lon)
-    y = (math.cos(lat1) * math.sin(lat2) - 
-         math.sin(lat1) * math.cos(lat2) * math.cos(delta_lon))
-    
-    angle = math.atan2(x, y)
-    bearing = (math.degrees(angle) + 360) % 360
-    
-    return round(bearing)
-
-
-def get_neighboring_links(from_node, to_node, link_attrs):
+    return int(calculate_bearings([start_coords], [end_coords])[0])
+
+
+def get_neighboring_links(from_node, to_node, link_attrs, node_index):
     """Find previous and next links in the network based on node connections.
 
-    Searches the network to find links that connect to the current link's
-    from_node (previous link) and to_node (next link), excluding U-turns.
+    Looks up links that connect to the current link's from_node (previous
+    link) and to_node (next link), excluding U-turns.
 
     Args:
         from_node: ID of the current link's starting node
         to_node: ID of the current link's ending node
         link_attrs: Dictionary mapping link_id to link attributes
+        node_index: Tuple of (from_node_links, to_node_links) from build_node_index
 
     Returns:
         Tuple of (previous_link_id, next_link_id), where either can be None
@@ -158,53 +261,23 @@ def get_neighboring_links(from_node, to_node, link_attrs):
         Excludes links that would create U-turns (previous.from == to_node,
         or next.to == from_node)
     """
-    previous = None
-    next_link = None
-
-    for link_id, attrs in link_attrs.items():
-        # Access dict attributes directly (not DataFrame columns)
-        if attrs.get('to') == from_node and attrs.get('from') != to_node:
-            if previous is None:
-                previous = link_id
-        elif attrs.get('from') == to_node and attrs.get('to') != from_node:
-            if next_link is None:
-                next_link = link_id
-
-    return previous, next_link
-
+    from_node_links, to_node_links = node_index
 
-def get_edge_coords(link_id, link_attrs, fallback):
-    """Extract edge coordinates from a link's geometry.
-
-    Handles both LineString and MultiLineString geometries by extracting
-    the first and last coordinates.
-
-    Args:
-        link_id: ID of the link to get coordinates from
-        link_attrs: Dictionary mapping link_id to link attributes
-        fallback: Fallback coordinates to return if link not found or error occurs
-
-    Returns:
-        Tuple of (start_coords, end_coords) where each is a (x, y) tuple
+    previous = next(
+        (link_id for link_id in to_node_links.get(from_node, ())
+         if link_attrs[link_id].get('from') != to_node),
+        None
+    )
+    next_link = next(
+        (link_id for link_id in from_node_links.get(to_node, ())
+         if link_attrs[link_id].get('to') != from_node),
+        None
+    )
 
-    Note:
-        For MultiLineString, uses first coordinate of first segment and
-        last coordinate of last segment.
-    """
-    if link_id is not None and link_id in link_attrs:
-        geom = link_attrs[link_id].get('geometry')
-        if geom is not None:
-            try:
-                if geom.geom_type == 'LineString':
-                    return geom.coords[0], geom.coords[-1]
-                elif geom.geom_type == 'MultiLineString':
-                    return geom.geoms[0].coords[0], geom.geoms[-1].coords[-1]
-            except Exception:
-                pass
-    return fallback, fallback
+    return previous, next_link
 
 
-def get_travel_endpoints(link_id, link_attrs):
+def get_travel_endpoints(link_id, link_attrs, node_index=None):
     """Determine actual travel start and end points considering network topology.
 
     Analyzes neighboring links to determine the true travel direction and endpoints
@@ -214,12 +287,14 @@ def get_travel_endpoints(link_id, link_attrs):
     Args:
         link_id: ID of the link to analyze
         link_attrs: Dictionary mapping link_id to link attributes including geometry
+        node_index: Optional prebuilt index from build_node_index; built on
+            the fly if omitted (pass it when resolving many links)
 
     Returns:
         Tuple of (travel_start, travel_end) where each is a (x, y) coordinate tuple
 
     Raises:
-        ValueError: If link has unsupported geometry type
+        ValueError: If link has a missing or unsupported geometry
 
     Note:
         This function is crucial for correct interpolation as it ensures vehicles
@@ -229,179 +304,421 @@ def get_travel_endpoints(link_id, link_attrs):
     from_node = attrs.get('from')
     to_node = attrs.get('to')
 
-    prev_link, next_link = get_neighboring_links(from_node, to_node, link_attrs)
+    if node_index is None:
+        node_index = build_node_index(link_attrs)
+    prev_link, next_link = get_neighboring_links(from_node, to_node, link_attrs, node_index)
 
-    current_geom = attrs.get('geometry')
+    # First/last coordinates cached by build_link_attributes_dict
+    ec1, ec2 = attrs.get('first_coord'), attrs.get('last_coord')
+    if ec1 is None:
+        raise ValueError(f"Unsupported geometry: {attrs.get('geometry')!r}")
 
-    # Handle both LineString and MultiLineString
-    if current_geom.geom_type == 'LineString':
-        ec1 = current_geom.coords[0]
-        ec2 = current_geom.coords[-1]
-    elif current_geom.geom_type == 'MultiLineString':
-        ec1 = current_geom.geoms[0].coords[0]
-        ec2 = current_geom.geoms[-1].coords[-1]
-    else:
-        raise ValueError(f"Unsupported geometry type: {current_geom.geom_type}")
+    ef1, ef2 = ec1, ec1
+    if prev_link is not None and link_attrs[prev_link].get('first_coord') is not None:
+        ef1, ef2 = link_attrs[prev_link]['first_coord'], link_attrs[prev_link]['last_coord']
 
-    ef1, ef2 = get_edge_coords(prev_link, link_attrs, ec1)
-    et1, et2 = get_edge_coords(next_link, link_attrs, ec2)
+    et1, et2 = ec2, ec2
+    if next_link is not None and link_attrs[next_link].get('first_coord') is not None:
+        et1, et2 = link_attrs[next_link]['first_coord'], link_attrs[next_link]['last_coord']
 
     # Determine travel direction
     travel_start = None
     travel_end = None
 
-    if ec1 in {ef1, ef2}:
-        travel_start = ef1 if ec1 == ef1 else ef2
-    elif ec1 in {et1, et2}:
-        travel_end = et1 if ec1 == et1 else et2
+    if ec1 == ef1 or ec1 == ef2:
+        travel_start = ec1
+    elif ec1 == et1 or ec1 == et2:
+        travel_end = ec1
     else:
         travel_start = ec1
 
-    if ec2 in {ef1, ef2}:
-        travel_start = ef1 if ec2 == ef1 else ef2
-    elif ec2 in {et1, et2}:
-        travel_end = et1 if ec2 == et1 else et2
+    if ec2 == ef1 or ec2 == ef2:
+        travel_start = ec2
+    elif ec2 == et1 or ec2 == et2:
+        travel_end = ec2
     else:
         travel_end = ec2
 
     return travel_start, travel_end
 
 
-def interpolate_trajectory(link_id, time_enter, time_leave,
-                          start_coords, end_coords, person_id,
-                          freespeed, link_length, bearing, interval_id):
-    """Interpolate trajectory points along a link with 1-second time resolution.
+def interpolate_trajectory(time_enter, time_leave, start_x, start_y, end_x, end_y,
+                           person_id, bearing, interval_id):
+    """Interpolate trajectory points along links with 1-second time resolution.
 
     Performs linear interpolation between start and end coordinates to create
-    a smooth animated trajectory. Generates one point per second with associated
-    temporal and spatial attributes.
+    smooth animated trajectories. Generates one point per second of travel for
+    every link traversal, fully vectorized over all traversals of a chunk.
 
     Args:
-        link_id: ID of the link being traversed
-        time_enter: Entry time in seconds since midnight
-        time_leave: Exit time in seconds since midnight
-        start_coords: Starting (x, y) coordinates
-        end_coords: Ending (x, y) coordinates
-        person_id: ID of the person/vehicle
-        freespeed: Free flow speed on the link (m/s)
-        link_length: Length of the link (meters)
-        bearing: Travel bearing in degrees (0-360)
-        interval_id: Time interval identifier
+        time_enter: Array of entry times in seconds since midnight
+        time_leave: Array of exit times in seconds since midnight
+        start_x: Array of travel start x coordinates
+        start_y: Array of travel start y coordinates
+        end_x: Array of travel end x coordinates
+        end_y: Array of travel end y coordinates
+        person_id: Array of person/vehicle IDs
+        bearing: Array of travel bearings in degrees (0-360)
+        interval_id: Array of time interval identifiers
 
     Returns:
-        List of GeoJSON feature dictionaries, one per second of travel,
-        or empty list if time_delta <= 0
+        Dictionary of equal-length column arrays with keys x, y, timestamp,
+        angle, person_id, and interval_id (one entry per trajectory point).
+        Traversals with time_leave <= time_enter produce no points.
 
     Note:
         Coordinates are rounded to 12 decimal places for precision without
-        excessive file size.
+        excessive file size. The rounding is a single in-place pass over the
+        chunk; it keeps text outputs (GeoJSON, CSV) compact.
+    """
+    time_enter = np.asarray(time_enter, dtype=np.int64)
+    time_delta = np.asarray(time_leave, dtype=np.int64) - time_enter
+
+    keep = time_delta > 0
+    time_enter = time_enter[keep]
+    time_delta = time_delta[keep]
+
+    # One output row per second. Per-event values are expanded with
+    # np.repeat, which is cheaper than gathering through an index array.
+    counts = time_delta + 1
+    offsets = np.cumsum(counts) - counts
+    position = np.arange(counts.sum())
+    t = position - np.repeat(offsets, counts)
+
+    fraction = t / np.repeat(time_delta, counts)
+    start_x = np.asarray(start_x, dtype=np.float64)[keep]
+    start_y = np.asarray(start_y, dtype=np.float64)[keep]
+    end_x = np.asarray(end_x, dtype=np.float64)[keep]
+    end_y = np.asarray(end_y, dtype=np.float64)[keep]
+
+    # Interpolate in place to avoid per-step temporaries, then round once
+    x = np.repeat(end_x - start_x, counts)
+    x *= fraction
+    x += np.repeat(start_x, counts)
+    np.round(x, 12, out=x)
+
+    y = np.repeat(end_y - start_y, counts)
+    y *= fraction
+    y += np.repeat(start_y, counts)
+    np.round(y, 12, out=y)
+
+    # time_enter + t == position + (time_enter - offset) for every point
+    seconds = position + np.repeat(time_enter - offsets, counts)
+
+    return {
+        'x': x,
+        'y': y,
+        'timestamp': time_to_timestamps(seconds),
+        'angle': np.repeat(np.asarray(bearing)[keep], counts),
+        'person_id': np.repeat(np.asarray(person_id)[keep], counts),
+        'interval_id': np.repeat(np.asarray(interval_id)[keep], counts),
+    }
+
+
+def resolve_travel_endpoints(link_ids, link_attrs):
+    """Resolve travel endpoints for links without precomputed values.
+
+    Fallback used by build_link_soa when build_link_attributes_dict was run
+    with precompute_endpoints=False.
+
+    Args:
+        link_ids: List of link IDs to resolve
+        link_attrs: Dictionary mapping link_id to link attributes
+
+    Returns:
+        Dictionary mapping link_id to (travel_start, travel_end); links that
+        fail to resolve are logged and omitted
+    """
+    node_index = build_node_index(link_attrs)
+    resolved = {}
+    for link_id in link_ids:
+        try:
+            resolved[link_id] = get_travel_endpoints(link_id, link_attrs, node_index)
+        except Exception as e:
+            logger.warning(f"Error processing link {link_id}: {e}")
+    return resolved
+
+
+# Per-worker state, set once by init_worker instead of being pickled per task
+_worker_links = None
+_worker_geojson_separator = None
+
+
+def init_worker(links, geojson_separator=None):
+    """Initialize per-worker state for process_parquet_chunk.
+
+    Used as the multiprocessing Pool initializer so the link arrays are
+    transferred once per worker rather than with every chunk.
+
+    Args:
+        links: LinkSoA from build_link_soa
+        geojson_separator: If set, workers also serialize each chunk's
+            GeoJSON features, joined by this separator
     """
-    time_delta = time_leave - time_enter
+    global _worker_links, _worker_geojson_separator
+    _worker_links = links
+    _worker_geojson_separator = geojson_separator
+
 
-    if time_delta <= 0:
-        return []
+def process_parquet_chunk(batch_buffer):
+    """Process a chunk of trajectory data and generate interpolated trajectory points.
 
-    features = []
-    for t in range(time_delta + 1):
-        fraction = t / time_delta
-        x = round(start_coords[0] + fraction * (end_coords[0] - start_coords[0]), 12)
-        y = round(start_coords[1] + fraction * (end_coords[1] - start_coords[1]), 12)
+    Main processing function that takes a chunk of event data and produces
+    interpolated trajectory points for animation. Each event's link is mapped
+    to its dense code once, link values are gathered from the struct-of-arrays,
+    and all traversals are expanded with vectorized NumPy operations.
 
-        feature = {
+    Args:
+        batch_buffer: Arrow IPC stream holding one RecordBatch of event data
+            with columns person, link_id, time_enter, time_leave, interval_id
+
+    Returns:
+        Dictionary of column arrays (x, y, timestamp, angle, person_id,
+        interval_id) as returned by interpolate_trajectory, plus the
+        serialized GeoJSON features under 'geojson' when enabled in
+        init_worker
+
+    Note:
+        Requires the worker to be initialized with init_worker. Links not
+        found in the network are tracked and reported but don't cause
+        processing to fail. This handles cases where events reference
+        links outside the loaded network boundaries.
+    """
+    batch = deserialize_batch(batch_buffer)
+    links = _worker_links
+
+    # Map each distinct link once: dictionary-encode the column and only
+    # convert the dictionary values to str keys, whatever the input type
+    link_ids = batch.column('link_id')
+    if not pa.types.is_dictionary(link_ids.type):
+        link_ids = pc.dictionary_encode(link_ids)
+    unique_links = link_ids.dictionary.cast(pa.string()).to_pylist()
+    unique_codes = links.lookup_codes(unique_links)
+    codes = unique_codes[link_ids.indices.to_numpy(zero_copy_only=False)]
+
+    if (unique_codes < 0).any():
+        links_not_found = [link_id for link_id, code in zip(unique_links, unique_codes) if code < 0]
+        logger.warning(f"Chunk had {len(links_not_found)} links not found in network. Sample: {links_not_found[:5]}")
+
+    mask = codes >= 0
+    codes = codes[mask]
+
+    def column(name):
+        return batch.column(name).to_numpy(zero_copy_only=False)[mask]
+
+    columns = interpolate_trajectory(
+        column('time_enter'),
+        column('time_leave'),
+        links.start_x[codes],
+        links.start_y[codes],
+        links.end_x[codes],
+        links.end_y[codes],
+        column('person'),
+        links.bearing[codes],
+        column('interval_id')
+    )
+
+    if _worker_geojson_separator is not None:
+        columns['geojson'] = dumps_features(build_features(columns), _worker_geojson_separator)
+
+    return columns
+
+
+def build_features(columns):
+    """Build GeoJSON point features from trajectory point columns.
+
+    Args:
+        columns: Dictionary of column arrays as returned by interpolate_trajectory
+
+    Returns:
+        List of GeoJSON feature dictionaries, one per trajectory point
+    """
+    return [
+        {
+            "type": "Feature",
             "geometry": {
                 "type": "Point",
                 "coordinates": [x, y]
             },
             "properties": {
-                "timestamp": time_to_timestamp(time_enter + t),
-                "angle": bearing,
+                "timestamp": timestamp,
+                "angle": angle,
                 "person_id": person_id,
                 "interval_id": interval_id
             }
         }
-        features.append(feature)
+        for x, y, timestamp, angle, person_id, interval_id in zip(
+            columns['x'].tolist(), columns['y'].tolist(),
+            columns['timestamp'].tolist(), columns['angle'].tolist(),
+            columns['person_id'].tolist(), columns['interval_id'].tolist())
+    ]
 
-    return features
 
+def columns_to_record_batch(columns):
+    """Convert trajectory point column arrays into an Arrow RecordBatch.
 
-def process_parquet_chunk(args):
-    """Process a chunk of trajectory data and generate interpolated GeoJSON features.
+    Args:
+        columns: Dictionary of column arrays as returned by interpolate_trajectory
 
-    Main processing function that takes a chunk of event data and produces
-    interpolated trajectory points for animation. Handles link lookups, coordinate
-    calculation, and feature generation.
+    Returns:
+        pyarrow.RecordBatch with TRAJECTORY_SCHEMA
+    """
+    return pa.RecordBatch.from_arrays(
+        [pa.array(columns[field.name], type=field.type) for field in TRAJECTORY_SCHEMA],
+        schema=TRAJECTORY_SCHEMA
+    )
+
+
+class GeoJSONChunkWriter:
+    """Write worker-serialized GeoJSON features chunk by chunk.
 
     Args:
-        args: Tuple of (chunk_df, link_attrs) where:
-            - chunk_df (DataFrame): Chunk of event data with columns
-              person, link_id, time_enter, time_leave, interval_id
-            - link_attrs (dict): Pre-built dictionary of link attributes
+        path: Output file path
+        ndjson: Write newline-delimited features instead of a FeatureCollection
+    """
 
-    Returns:
-        Tuple of (features_list, links_not_found_set, processed_count) where:
-            - features_list: List of GeoJSON feature dictionaries
-            - links_not_found_set: Set of link IDs that weren't in the network
-            - processed_count: Number of events successfully processed
+    def __init__(self, path, ndjson=False):
+        self.ndjson = ndjson
+        self.first = True
+        self.file = open(path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        if not ndjson:
+            self.file.write(FEATURE_COLLECTION_HEADER)
+
+    def write(self, columns, batch):
+        if not columns['geojson']:
+            return
+        if self.ndjson:
+            self.file.write(columns['geojson'] + b'\n')
+        else:
+            if not self.first:
+                self.file.write(FEATURE_SEPARATOR)
+            self.file.write(columns['geojson'])
+        self.first = False
+
+    def close(self):
+        if not self.file.closed and not self.ndjson:
+            self.file.write(FEATURE_COLLECTION_FOOTER)
+        self.file.close()
+
+
+class CSVChunkWriter:
+    """Write trajectory record batches to CSV (header written on creation).
 
-    Note:
-        Links not found in the network are tracked and reported but don't
-        cause processing to fail. This handles cases where events reference
-        links outside the loaded network boundaries.
+    Args:
+        path: Output file path
     """
-    chunk_df, link_attrs = args
 
-    all_features = []
-    links_not_found = set()
+    def __init__(self, path):
+        self.sink = pa.output_stream(path, buffer_size=WRITE_BUFFER_SIZE)
+        self.writer = pa_csv.CSVWriter(
+            self.sink, TRAJECTORY_SCHEMA,
+            write_options=pa_csv.WriteOptions(quoting_style='needed')
+        )
 
-    for _, row in chunk_df.iterrows():
-        # Ensure link_id is string for lookup consistency
-        link_id = str(row['link_id'])
+    def write(self, columns, batch):
+        self.writer.write_batch(batch)
 
-        if link_id not in link_attrs:
-            links_not_found.add(link_id)
-            continue
+    def close(self):
+        self.writer.close()
+        self.sink.close()
 
-        try:
-            attrs = link_attrs[link_id]
-
-            # Use precomputed values (massive speedup!)
-            start_coords = attrs.get('travel_start')
-            end_coords = attrs.get('travel_end')
-            bearing = attrs.get('bearing')
-
-            # Fallback if not precomputed (shouldn't happen with default settings)
-            if start_coords is None or end_coords is None:
-                start_coords, end_coords = get_travel_endpoints(link_id, link_attrs)
-                bearing = calculate_bearing(start_coords, end_coords)
-
-            features = interpolate_trajectory(
-                link_id,
-                row['time_enter'],
-                row['time_leave'],
-                start_coords,
-                end_coords,
-                row['person'],
-                attrs.get('freespeed'),
-                attrs.get('length'),
-                bearing,
-                row['interval_id']  # Pass interval_id through
-            )
-
-            all_features.extend(features)
 
-        except Exception as e:
-            logger.warning(f"Error processing link {link_id}: {e}")
-            continue
+class ParquetChunkWriter:
+    """Stream trajectory record batches to Parquet, one row group per chunk.
+
+    Coordinates are narrowed to float32 (see PARQUET_TRAJECTORY_SCHEMA).
+
+    Args:
+        path: Output file path
+    """
+
+    def __init__(self, path):
+        self.writer = pq.ParquetWriter(path, PARQUET_TRAJECTORY_SCHEMA, compression=PARQUET_COMPRESSION)
 
-    if links_not_found:
-        logger.warning(f"Chunk had {len(links_not_found)} links not found in network. Sample: {list(links_not_found)[:5]}")
+    def write(self, columns, batch):
+        self.writer.write_batch(batch.cast(PARQUET_TRAJECTORY_SCHEMA))
 
-    return all_features
+    def close(self):
+        self.writer.close()
+
+
+class GeoParquetChunkWriter:
+    """Stream trajectory record batches to GeoParquet with WKB point geometry.
+
+    The x/y columns are replaced by a WKB 'geometry' column.
+
+    Args:
+        path: Output file path
+    """
+
+    def __init__(self, path):
+        self.fields = [field for field in TRAJECTORY_SCHEMA if field.name not in ('x', 'y')]
+        self.schema = geoparquet_schema(pa.schema(self.fields), geometry_types=['Point'])
+        self.writer = pq.ParquetWriter(path, self.schema, compression=PARQUET_COMPRESSION)
+
+    def write(self, columns, batch):
+        self.writer.write_batch(pa.RecordBatch.from_arrays(
+            [batch.column(field.name) for field in self.fields]
+            + [points_to_wkb(columns['x'], columns['y'])],
+            schema=self.schema
+        ))
+
+    def close(self):
+        self.writer.close()
+
+
+def open_chunk_writers(output_paths, geojson_ndjson=False):
+    """Open one chunk writer per requested output format.
+
+    Args:
+        output_paths: Dictionary mapping format name to output path
+        geojson_ndjson: Write GeoJSON as newline-delimited features
+
+    Returns:
+        Dictionary mapping format name to an open chunk writer; on failure,
+        writers opened so far are closed before the error propagates
+    """
+    writers = {}
+    try:
+        for fmt, path in output_paths.items():
+            if fmt == 'geojson':
+                writers[fmt] = GeoJSONChunkWriter(path, ndjson=geojson_ndjson)
+            elif fmt == 'csv':
+                writers[fmt] = CSVChunkWriter(path)
+            elif fmt == 'parquet':
+                writers[fmt] = ParquetChunkWriter(path)
+            elif fmt == 'geoparquet':
+                writers[fmt] = GeoParquetChunkWriter(path)
+            else:
+                raise ValueError(f"Unsupported output format: {fmt}")
+    except Exception:
+        for writer in writers.values():
+            writer.close()
+        raise
+    return writers
+
+
+def auto_chunk_size(total_rows, num_workers):
+    """Pick an export chunk size from the event count and worker count.
+
+    Aims for about 8 chunks per worker, so per-task overhead stays small while
+    a single slow chunk cannot stall the pool at the end of the run. The
+    result is clamped to [MIN_CHUNK_SIZE, MAX_CHUNK_SIZE].
+
+    Args:
+        total_rows: Number of events in the input Parquet file
+        num_workers: Number of worker processes
+
+    Returns:
+        Number of events per chunk
+    """
+    rows_per_worker = total_rows // max(num_workers, 1)
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, rows_per_worker // 8))
 
 
 def parquet_to_export(parquet_input, link_attrs, output_base,
-                       output_formats, num_workers, chunk_size,
-                       gpkg_network=None):
+                       output_formats, num_workers, chunk_size=None,
+                       gpkg_network=None, mp_context=None, geojson_ndjson=False):
     """Main function to convert Parquet to multiple output formats with interpolation.
 
     Args:
@@ -410,9 +727,11 @@ def parquet_to_export(parquet_input, link_attrs, output_base,
         output_base: Base path for output files (without extension)
         output_formats: List of formats to generate (geojson, csv, parquet, geoparquet)
         num_workers: Number of worker processes
-        chunk_size: Chunk size for processing
+        chunk_size: Events per chunk; None picks one with auto_chunk_size
         gpkg_network: Path to GeoPackage (optional, for standalone use)
-        geojson_output: Legacy parameter for backward compatibility
+        mp_context: Optional multiprocessing context (default: platform default)
+        geojson_ndjson: Write GeoJSON as newline-delimited features (one
+            Feature object per line) instead of a single FeatureCollection
     """
 
     # Load network if not provided (for standalone use)
@@ -423,11 +742,21 @@ def parquet_to_export(parquet_input, link_attrs, output_base,
         network_df = load_network_with_cache(gpkg_network)
         link_attrs = build_link_attributes_dict(network_df, link_id_col='linkId', precompute_endpoints=True)
 
+    links = build_link_soa(
+        link_attrs,
+        resolve_endpoints=partial(resolve_travel_endpoints, link_attrs=link_attrs)
+    )
+
     # Read Parquet file
     logger.info(f"Reading Parquet file: {parquet_input}")
     parquet_file = pq.ParquetFile(parquet_input)
     total_rows = parquet_file.metadata.num_rows
     logger.info(f"Total events to process: {total_rows:,}")
+    if chunk_size is None:
+        chunk_size = auto_chunk_size(total_rows, num_workers)
+        logger.info(f"Chunk size: {chunk_size:,} events (auto)")
+    else:
+        logger.info(f"Chunk size: {chunk_size:,} events")
 
     # Setup output files
     output_paths = {}
@@ -438,76 +767,69 @@ def parquet_to_export(parquet_input, link_attrs, output_base,
     for fmt, path in output_paths.items():
         logger.info(f"  {fmt}: {path}")
 
+    # GeoJSON features are serialized by the workers when requested
+    geojson_separator = None
+    if 'geojson' in output_formats:
+        geojson_separator = b'\n' if geojson_ndjson else FEATURE_SEPARATOR
+
     # Setup multiprocessing
     logger.info(f"Initializing multiprocessing pool with {num_workers} workers")
-    pool = mp.Pool(num_workers)
+    if mp_context is None:
+        mp_context = mp.get_context()
+    pool = mp_context.Pool(
+        num_workers,
+        initializer=init_worker,
+        initargs=(links, geojson_separator)
+    )
 
     # Process in chunks using multiprocessing
     logger.info("Creating trajectory features with interpolation...")
 
-    # Open all output writers
     writers = {}
+    stop_reading = threading.Event()
+    io_executor = ThreadPoolExecutor(max_workers=1)
 
     try:
-        # GeoJSON writer
-        if 'geojson' in output_formats:
-            writers['geojson'] = open(output_paths['geojson'], 'w')
-            writers['geojson'].write('{"type": "FeatureCollection", "features": [\n')
-            writers['geojson_first'] = True
-
-        # CSV writer
-        if 'csv' in output_formats:
-            csv_file = open(output_paths['csv'], 'w', newline='')
-            csv_writer = csv_module.writer(csv_file)
-            csv_writer.writerow(['x', 'y', 'timestamp', 'angle', 'person_id', 'interval_id'])  # Header
-            writers['csv'] = csv_file
-            writers['csv_writer'] = csv_writer
-
-        # Parquet/GeoParquet - collect all features first
-        if 'parquet' in output_formats or 'geoparquet' in output_formats:
-            writers['features_list'] = []
+        # Open all output writers; each one handles a whole chunk per call
+        writers = open_chunk_writers(output_paths, geojson_ndjson=geojson_ndjson)
+        needs_batch = any(fmt != 'geojson' for fmt in writers)
+
+        # Writes run on a dedicated I/O thread so encoding and disk writes
+        # overlap with fetching the next chunk; the deque bounds how many
+        # finished chunks can wait for the writer.
+        def write_chunk(columns):
+            batch = columns_to_record_batch(columns) if needs_batch else None
+            for writer in writers.values():
+                writer.write(columns, batch)
+
+        io_futures = deque()
 
         processed = 0
         batches_processed = 0
+        in_flight = threading.Semaphore(2 * num_workers)
 
-        # Create iterator of (df, link_attrs) tuples for all batches
+        # Create iterator of IPC-serialized record batches. The pool's task
+        # handler thread pulls from it, so reading and decompression overlap
+        # with worker compute; the semaphore keeps at most 2 chunks per
+        # worker in flight so memory stays bounded.
         def batch_generator():
-            for batch in parquet_file.iter_batches(batch_size=chunk_size):
-                df = batch.to_pandas()
-                yield (df, link_attrs)
-
-        # Process batches in parallel using the pool
-        for features in pool.imap_unordered(process_parquet_chunk, batch_generator()):
-            # Write features to all formats
-            for feature in features:
-                props = feature['properties']
-                coords = feature['geometry']['coordinates']
-
-                # GeoJSON
-                if 'geojson' in output_formats:
-                    if not writers['geojson_first']:
-                        writers['geojson'].write(',\n')
-                    json.dump(feature, writers['geojson'])
-                    writers['geojson_first'] = False
-
-                # CSV
-                if 'csv' in output_formats:
-                    writers['csv_writer'].writerow([
-                        coords[0], coords[1],  # x, y
-                        props['timestamp'], props['angle'], props['person_id'],
-                        props['interval_id']
-                    ])
-
-                # Collect for Parquet/GeoParquet
-                if 'parquet' in output_formats or 'geoparquet' in output_formats:
-                    writers['features_list'].append({
-                        'x': coords[0],
-                        'y': coords[1],
-                        'timestamp': props['timestamp'],
-                        'angle': props['angle'],
-                        'person_id': props['person_id'],
-                        'interval_id': props['interval_id']
-                    })
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=EVENT_COLUMNS,
+                                                   use_threads=True):
+                while not in_flight.acquire(timeout=0.1):
+                    if stop_reading.is_set():
+                        return
+                yield serialize_batch(batch)
+
+        # Process batches in parallel using the pool. Each task is already a
+        # full chunk_size batch and link arrays come from init_worker, so
+        # tasks are dispatched one at a time (chunksize=1); grouping them
+        # would also stall against the in-flight limit above.
+        for columns in pool.imap_unordered(process_parquet_chunk, batch_generator(), chunksize=1):
+            in_flight.release()
+
+            io_futures.append(io_executor.submit(write_chunk, columns))
+            if len(io_futures) > MAX_PENDING_WRITES:
+                io_futures.popleft().result()
 
             processed += chunk_size  # Approximate (last batch may be smaller)
             batches_processed += 1
@@ -517,40 +839,25 @@ def parquet_to_export(parquet_input, link_attrs, output_base,
                 progress = min(100, (processed / total_rows) * 100)
                 logger.info(f"Progress: {min(processed, total_rows):,}/{total_rows:,} events ({progress:.1f}%)")
 
-        # Close GeoJSON
-        if 'geojson' in output_formats:
-            writers['geojson'].write('\n]}')
-            writers['geojson'].close()
-            logger.success(f"GeoJSON created: {output_paths['geojson']}")
-
-        # Close CSV
-        if 'csv' in output_formats:
-            writers['csv'].close()
-            logger.success(f"CSV created: {output_paths['csv']}")
-
-        # Write Parquet
-        if 'parquet' in output_formats:
-            df_out = pd.DataFrame(writers['features_list'])
-            df_out.to_parquet(output_paths['parquet'], index=False)
-            logger.success(f"Parquet created: {output_paths['parquet']}")
-
-        # Write GeoParquet
-        if 'geoparquet' in output_formats:
-            df_out = pd.DataFrame(writers['features_list'])
-            # Create geometry from x, y
-            geometry = [Point(row['x'], row['y']) for _, row in df_out.iterrows()]
-            gdf_out = gpd.GeoDataFrame(df_out.drop(columns=['x', 'y']), geometry=geometry, crs='EPSG:4326')
-            gdf_out.to_parquet(output_paths['geoparquet'])
-            logger.success(f"GeoParquet created: {output_paths['geoparquet']}")
+        # Wait for pending writes (re-raises any writer error)
+        while io_futures:
+            io_futures.popleft().result()
+
+        # Close writers (finalizes file footers)
+        for fmt, writer in writers.items():
+            writer.close()
+            logger.success(f"{FORMAT_LABELS[fmt]} created: {output_paths[fmt]}")
 
     finally:
+        stop_reading.set()
+        io_executor.shutdown(wait=True, cancel_futures=True)
+
         # Clean up any open file handles
-        for key, val in writers.items():
-            if hasattr(val, 'close'):
-                try:
-                    val.close()
-                except:
-                    pass
+        for writer in writers.values():
+            try:
+                writer.close()
+            except:
+                pass
         pool.close()
         pool.join()
 
@@ -565,7 +872,10 @@ if __name__ == "__main__":
     parser.add_argument("--output_formats", nargs='+', default=['geojson'],
                        help="Output formats: geojson, csv, parquet, geoparquet")
     parser.add_argument("--num_workers", type=int, default=mp.cpu_count())
-    parser.add_argument("--chunk_size", type=int, default=10000)
+    parser.add_argument("--chunk_size", type=int, default=None,
+                       help="Events per chunk (default: auto from event and worker count)")
+    parser.add_argument("--geojson_ndjson", action="store_true",
+                       help="Write GeoJSON as newline-delimited features")
 
     args = parser.parse_args()
 
@@ -576,7 +886,8 @@ if __name__ == "__main__":
         output_formats=args.output_formats,
         num_workers=args.num_workers,
         chunk_size=args.chunk_size,
-        gpkg_network=args.gpkg_network
+        gpkg_network=args.gpkg_network,
+        geojson_ndjson=args.geojson_ndjson
     )
     # parquet_to_export(
     #     "/Users/noahkim/Documents/UTPS/Traffic_Sim/utps-ts-repo/data/interim/filtered_events_test.parquet",
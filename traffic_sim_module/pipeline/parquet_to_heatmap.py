@@ -8,9 +8,9 @@ Key Features:
     - Regular time interval sampling (configurable resolution)
     - Aggregation of vehicle counts per road link
     - Multiple export formats (GeoJSON, CSV, Parquet, GeoParquet)
-    - Parallel processing of time points for performance
+    - Parallel processing of independent link blocks
     - Precomputed link center coordinates for fast lookups
-    - Vectorized pandas operations for efficiency
+    - Sweep-line vehicle counts over sorted enter/leave times
 
 The heatmap generation process:
     1. Loads filtered trajectory events from Parquet
@@ -32,21 +32,26 @@ Example:
     ... )
 """
 
-import csv as csv_module
 from datetime import datetime, timedelta
-from functools import partial
-import json
 import multiprocessing as mp
 from pathlib import Path
 
-import geopandas as gpd
 import numpy as np
 import pandas as pd
-from shapely.geometry import Point
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 
 # Handle both module import and direct script execution
 try:
     from ..config import logger
+    from ..utils.geojson import (
+        FEATURE_COLLECTION_FOOTER,
+        FEATURE_COLLECTION_HEADER,
+        FEATURE_SEPARATOR,
+        dumps_features,
+    )
+    from ..utils.geoparquet import geoparquet_schema, points_to_wkb
     from ..utils.network_cache import build_link_attributes_dict, load_network_cached
 except ImportError:
     # Running as standalone script - setup minimal logging
@@ -61,11 +66,30 @@ except ImportError:
     # Import from absolute path
     repo_root = Path(__file__).parent.parent.parent
     sys.path.insert(0, str(repo_root))
+    from traffic_sim_module.utils.geojson import (
+        FEATURE_COLLECTION_FOOTER,
+        FEATURE_COLLECTION_HEADER,
+        FEATURE_SEPARATOR,
+        dumps_features,
+    )
+    from traffic_sim_module.utils.geoparquet import geoparquet_schema, points_to_wkb
     from traffic_sim_module.utils.network_cache import (
         build_link_attributes_dict,
         load_network_cached,
     )
 
+# Event columns read from the filtered Parquet input
+HEATMAP_EVENT_COLUMNS = ['link_id', 'time_enter', 'time_leave']
+
+# Tile size (links x timepoints) of one count_active_vehicles call in the
+# workers. 1024 x 256 cells keep the query and count matrices at about
+# 2 MB each, so a tile stays cache-resident on typical CPUs.
+LINK_TILE = 1024
+TIMEPOINT_TILE = 256
+
+# Number of records serialized per GeoJSON write
+GEOJSON_BLOCK_SIZE = 100_000
+
 
 def time_to_timestamp(seconds):
     """Convert seconds since midnight to formatted timestamp string.
@@ -86,77 +110,230 @@ def time_to_timestamp(seconds):
     return (base + timedelta(seconds=int(seconds))).strftime('%Y/%m/%d %H:%M:%S')
 
 
-def process_timepoint_batch(timepoints, df, link_attrs):
-    """Process a batch of time points to generate heatmap records.
+def sweep_key_dtype(n_links, time_span):
+    """Pick the narrowest integer dtype that holds every sweep key.
+
+    Args:
+        n_links: Number of link codes
+        time_span: Number of seconds covered per link
+
+    Returns:
+        np.int32 if all keys fit, np.int64 otherwise
+    """
+    return np.int32 if n_links * time_span <= np.iinfo(np.int32).max else np.int64
+
+
+def build_sweep_keys(link_codes, times, time_origin, time_span, dtype=np.int64):
+    """Encode (link, time) pairs as sorted integer keys for the sweep count.
+
+    Each key is link_code * time_span + (time - time_origin), so sorting the
+    keys orders events by link and then by time, and a single searchsorted
+    over the keys answers "how many events of link l happened at or before
+    time t" for every (l, t) pair at once.
+
+    Args:
+        link_codes: Integer link code per event
+        times: Event times in seconds since midnight
+        time_origin: Smallest time covered by the keys
+        time_span: Number of seconds covered per link (must exceed every
+            time - time_origin, including those of the timepoints)
+        dtype: Integer dtype of the keys (see sweep_key_dtype)
+
+    Returns:
+        Sorted array of keys
+    """
+    keys = link_codes.astype(dtype) * dtype(time_span) + (times.astype(dtype) - dtype(time_origin))
+    keys.sort()
+    return keys
+
+
+def count_active_vehicles(timepoints, enter_keys, leave_keys, n_links, time_origin, time_span,
+                          link_start=0):
+    """Count vehicles active on every link at each timepoint with a sweep.
 
-    For each timepoint in the batch, counts active vehicles on each link and
-    creates heatmap records with vehicle counts and geographic coordinates.
-    Uses vectorized pandas operations for efficient processing.
+    The number of vehicles on link l at time t is the number of its events
+    that entered at or before t minus the number that left at or before t.
+    Both terms come from one searchsorted per key array, so each event is
+    touched O(log N) times per query instead of being rescanned for every
+    timepoint.
 
     Args:
-        timepoints: List of integer timestamps (seconds since midnight) to sample
-        df: DataFrame with columns link_id, time_enter, time_leave, and interval_id
-        link_attrs: Dictionary mapping link_id to attributes including 'center' coords
+        timepoints: Integer timestamps (seconds since midnight) to sample
+        enter_keys: Sorted sweep keys of the event enter times (see build_sweep_keys)
+        leave_keys: Sorted sweep keys of the event leave times
+        n_links: Number of link codes
+        time_origin: Time origin used to build the keys
+        time_span: Time span used to build the keys
+        link_start: First link code to count (counts links link_start to
+            link_start + n_links - 1)
 
     Returns:
-        List of heatmap record dictionaries with keys:
-            - timestamp: Formatted timestamp string
-            - lon: Longitude of link center
-            - lat: Latitude of link center
-            - vehicle_count: Number of active vehicles
-            - link_id: Link identifier
+        int64 array of shape (n_links, len(timepoints)) with vehicle counts
+
+    Note:
+        Events must satisfy time_enter < time_leave; events that can never be
+        active (time_leave <= time_enter) have to be dropped beforehand.
+    """
+    # Queries must share the key dtype, otherwise searchsorted casts (copies)
+    # the whole key array on every call
+    offsets = np.asarray(timepoints, dtype=np.int64) - time_origin
+    queries = np.arange(link_start, link_start + n_links, dtype=np.int64)[:, None] * time_span + offsets[None, :]
+    queries = queries.astype(enter_keys.dtype, copy=False)
+    return (np.searchsorted(enter_keys, queries, side='right')
+            - np.searchsorted(leave_keys, queries, side='right'))
+
+
+def timepoints_to_timestamps(timepoints):
+    """Convert an array of seconds since midnight to formatted timestamp strings.
+
+    Vectorized counterpart of time_to_timestamp.
+
+    Args:
+        timepoints: Array of seconds since midnight
+
+    Returns:
+        Object array of timestamp strings in 'YYYY/MM/DD HH:MM:SS' format
+    """
+    times = pd.Timestamp(2024, 1, 1) + pd.to_timedelta(np.asarray(timepoints), unit='s')
+    return np.asarray(times.strftime('%Y/%m/%d %H:%M:%S'), dtype=object)
+
+
+def split_sweep_keys(enter_keys, leave_keys, n_links, time_span, n_blocks):
+    """Split the sweep keys into contiguous link blocks.
+
+    Keys are sorted by link first, so the events of a block of links form
+    one contiguous slice of each key array. Keys in each slice are rebased
+    to the block's first link, so a block can be counted on its own.
+
+    Args:
+        enter_keys: Sorted sweep keys of the event enter times (see build_sweep_keys)
+        leave_keys: Sorted sweep keys of the event leave times
+        n_links: Number of link codes
+        time_span: Time span used to build the keys
+        n_blocks: Number of link blocks to create (at most n_links)
+
+    Returns:
+        List of (link_start, n_block_links, enter_keys, leave_keys) tuples
+    """
+    bounds = np.unique(np.linspace(0, n_links, max(1, min(n_blocks, n_links)) + 1).astype(np.int64))
+    if len(bounds) == 1:
+        bounds = np.array([0, 0])
+    key_bounds = (bounds * time_span).astype(enter_keys.dtype)
+    enter_offsets = np.searchsorted(enter_keys, key_bounds)
+    leave_offsets = np.searchsorted(leave_keys, key_bounds)
+
+    blocks = []
+    for i in range(len(bounds) - 1):
+        base = key_bounds[i]
+        blocks.append((
+            int(bounds[i]),
+            int(bounds[i + 1] - bounds[i]),
+            enter_keys[enter_offsets[i]:enter_offsets[i + 1]] - base,
+            leave_keys[leave_offsets[i]:leave_offsets[i + 1]] - base,
+        ))
+    return blocks
+
+
+# Per-worker state, set once per worker process by init_worker
+_worker_timepoints = None
+_worker_time_origin = None
+_worker_time_span = None
+
+
+def init_worker(timepoints, time_origin, time_span):
+    """Initialize per-worker state for process_link_block.
+
+    Used as the multiprocessing Pool initializer so the timepoints are
+    transferred once per worker rather than with every block.
+
+    Args:
+        timepoints: Integer timestamps (seconds since midnight) to sample
+        time_origin: Time origin used to build the keys
+        time_span: Time span used to build the keys
+    """
+    global _worker_timepoints, _worker_time_origin, _worker_time_span
+    _worker_timepoints = np.asarray(timepoints, dtype=np.int32)
+    _worker_time_origin = time_origin
+    _worker_time_span = time_span
+
+
+def process_link_block(block):
+    """Count active vehicles for one block of links at every timepoint.
+
+    Counts active vehicles on each link of the block at all timepoints with
+    count_active_vehicles and returns the nonzero cells as column arrays.
+    Each block carries only the events of its own links, so no worker reads
+    the events of another block.
+
+    Args:
+        block: (link_start, n_block_links, enter_keys, leave_keys) tuple as
+            returned by split_sweep_keys
+
+    Returns:
+        Tuple of (link_codes, timepoint_seconds, vehicle_counts) int32
+        arrays, one entry per nonzero (link, timepoint) cell
 
     Note:
         A vehicle is considered active on a link if time_enter <= timepoint < time_leave.
-        Links without center coordinates are skipped.
     """
-    records = []
-
-    for timepoint in timepoints:
-        # Vectorized filtering: count vehicles where time_enter <= timepoint < time_leave
-        mask = (df['time_enter'] <= timepoint) & (df['time_leave'] > timepoint)
-        active_vehicles = df[mask]
-
-        # Group by link_id and count
-        counts = active_vehicles.groupby('link_id', as_index=False).size()
-        counts.columns = ['link_id', 'vehicle_count']
-
-        # Convert to records with coordinates
-        timestamp = time_to_timestamp(timepoint)
-
-        for _, row in counts.iterrows():
-            link_id = row['link_id']
-            vehicle_count = row['vehicle_count']
-
-            # Skip if link not in network
-            if link_id not in link_attrs:
-                continue
-
-            # Get precomputed center coordinates
-            center = link_attrs[link_id].get('center')
-            if center is None:
-                continue
-
-            lon, lat = center
-
-            # Create record
-            record = {
-                'link_id': link_id,
-                'x': lon,
-                'y': lat,
-                'timestamp': timestamp,
-                'timepoint_seconds': int(timepoint),
-                'vehicle_count': int(vehicle_count)
-            }
-            records.append(record)
+    link_start, n_links, enter_keys, leave_keys = block
+    timepoints = _worker_timepoints
+
+    # Count tile by tile so the count and query matrices stay cache-sized
+    # regardless of the block size and the number of timepoints
+    parts = []
+    for l0 in range(0, n_links, LINK_TILE):
+        n_tile_links = min(LINK_TILE, n_links - l0)
+        for t0 in range(0, len(timepoints), TIMEPOINT_TILE):
+            tile_timepoints = timepoints[t0:t0 + TIMEPOINT_TILE]
+            counts = count_active_vehicles(tile_timepoints, enter_keys, leave_keys, n_tile_links,
+                                           _worker_time_origin, _worker_time_span, link_start=l0)
+
+            # Transpose so cells come out ordered by timepoint, then link
+            t_idx, codes = np.nonzero(counts.T)
+            parts.append(((codes + link_start + l0).astype(np.int32), tile_timepoints[t_idx],
+                          counts[codes, t_idx].astype(np.int32)))
 
-    return records
+    if not parts:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty, empty
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def build_features(records):
+    """Build GeoJSON point features from heatmap records.
+
+    Args:
+        records: DataFrame of heatmap records
+
+    Returns:
+        List of GeoJSON feature dictionaries, one per record
+    """
+    return [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [x, y]
+            },
+            "properties": {
+                "link_id": link_id,
+                "timestamp": timestamp,
+                "timepoint_seconds": timepoint_seconds,
+                "vehicle_count": vehicle_count
+            }
+        }
+        for link_id, x, y, timestamp, timepoint_seconds, vehicle_count in zip(
+            records['link_id'].tolist(), records['x'].tolist(), records['y'].tolist(),
+            records['timestamp'].tolist(), records['timepoint_seconds'].tolist(),
+            records['vehicle_count'].tolist())
+    ]
 
 
 def parquet_to_heatmap(parquet_input, link_attrs, output_base,
                        output_formats, time_interval_seconds,
                        start_time=None, end_time=None,
-                       num_workers=None, gpkg_network=None):
+                       num_workers=None, gpkg_network=None, mp_context=None):
     """
     Convert Parquet events to heatmap data with time-interval sampling.
 
@@ -170,6 +347,13 @@ def parquet_to_heatmap(parquet_input, link_attrs, output_base,
         end_time: Optional end time in seconds (if None, use max from data)
         num_workers: Number of parallel workers (default: CPU count)
         gpkg_network: Path to GeoPackage (optional, for standalone use)
+        mp_context: Optional multiprocessing context (default: platform default)
+
+    Note:
+        The time range filter is pushed down into the Parquet reader, so row
+        groups outside [start_time, end_time] are skipped. This requires the
+        input to be sorted by time_enter, as written by xml_to_parquet; a
+        warning is logged if it is not.
     """
 
     # Load network if not provided (for standalone use)
@@ -183,15 +367,27 @@ def parquet_to_heatmap(parquet_input, link_attrs, output_base,
     # Set default workers
     if num_workers is None:
         num_workers = mp.cpu_count()
+    if mp_context is None:
+        mp_context = mp.get_context()
 
-    # Read Parquet file
+    # Read Parquet file, pruned to the needed columns. With an explicit time
+    # range, events that cannot be active at any timepoint are filtered in
+    # the reader, which also skips whole row groups by their statistics.
+    # The last timepoint can lie up to one interval past end_time.
     logger.info(f"Reading Parquet file: {parquet_input}")
-    df = pd.read_parquet(parquet_input)
+    filters = []
+    if start_time is not None:
+        filters.append(('time_leave', '>', start_time))
+    if end_time is not None:
+        filters.append(('time_enter', '<=', end_time + time_interval_seconds))
+    # link_id is read dictionary-encoded, i.e. as a pandas category
+    df = pq.read_table(parquet_input, columns=HEATMAP_EVENT_COLUMNS, filters=filters or None,
+                       read_dictionary=['link_id']).to_pandas()
     total_rows = len(df)
     logger.info(f"Total events loaded: {total_rows:,}")
-
-    # Ensure link_id is string for consistency
-    df['link_id'] = df['link_id'].astype(str)
+    if not (np.diff(df['time_enter'].to_numpy()) >= 0).all():
+        logger.warning("Input events are not sorted by time_enter; time-range filtering "
+                       "cannot skip row groups efficiently")
 
     # Determine time range
     if start_time is None:
@@ -205,30 +401,66 @@ def parquet_to_heatmap(parquet_input, link_attrs, output_base,
     timepoints = np.arange(start_time, end_time + time_interval_seconds, time_interval_seconds)
     logger.info(f"Generating {len(timepoints)} timepoints at {time_interval_seconds}s intervals")
 
-    # Split timepoints into batches for parallel processing
-    # Each worker processes ~10 timepoints
-    batch_size = max(1, len(timepoints) // (num_workers * 2))
-    timepoint_batches = [timepoints[i:i + batch_size] for i in range(0, len(timepoints), batch_size)]
-
-    logger.info(f"Processing {len(timepoints)} timepoints in {len(timepoint_batches)} batches using {num_workers} workers...")
-
-    # Create worker function with fixed df and link_attrs
-    worker_func = partial(process_timepoint_batch, df=df, link_attrs=link_attrs)
-
-    # Process batches in parallel
-    heatmap_records = []
-    with mp.Pool(num_workers) as pool:
+    # Build the sweep keys once: events that can never be active (or have
+    # no link) are dropped, the category codes of link_id serve as integer link codes
+    # (only the categories are converted to strings, to match link_attrs),
+    # and the key time range covers both the events and the timepoints.
+    df = df[(df['time_leave'] > df['time_enter']) & df['link_id'].notna()]
+    link_category = df['link_id'].cat.remove_unused_categories()
+    link_codes = link_category.cat.codes.to_numpy()
+    link_ids = link_category.cat.categories.astype(str)
+    time_enter = df['time_enter'].to_numpy()
+    time_leave = df['time_leave'].to_numpy()
+    time_origin = int(time_enter.min(initial=timepoints[0]))
+    time_span = int(time_leave.max(initial=timepoints[-1])) - time_origin + 1
+    key_dtype = sweep_key_dtype(len(link_ids), time_span)
+    enter_keys = build_sweep_keys(link_codes, time_enter, time_origin, time_span, key_dtype)
+    leave_keys = build_sweep_keys(link_codes, time_leave, time_origin, time_span, key_dtype)
+
+    # Partition the links into contiguous blocks, several per worker for
+    # load balancing; each block is counted against all timepoints
+    link_blocks = split_sweep_keys(enter_keys, leave_keys, len(link_ids), time_span, num_workers * 4)
+
+    logger.info(f"Processing {len(timepoints)} timepoints for {len(link_ids):,} links in "
+                f"{len(link_blocks)} link blocks using {num_workers} workers...")
+
+    # Link center coordinates per link code; NaN marks links that are not in
+    # the network or have no center, so lookups become plain array indexing
+    centers = [link_attrs.get(link_id, {}).get('center') for link_id in link_ids]
+    center_x = np.array([np.nan if c is None else c[0] for c in centers], dtype=np.float64)
+    center_y = np.array([np.nan if c is None else c[1] for c in centers], dtype=np.float64)
+
+    # Process link blocks in parallel; workers receive the timepoints once
+    # through the pool initializer and return the nonzero cells as arrays
+    batch_results = []
+    initargs = (timepoints, time_origin, time_span)
+    with mp_context.Pool(num_workers, initializer=init_worker, initargs=initargs) as pool:
         batch_num = 0
-        for batch_records in pool.imap_unordered(worker_func, timepoint_batches):
-            heatmap_records.extend(batch_records)
+        for batch_result in pool.imap_unordered(process_link_block, link_blocks):
+            batch_results.append(batch_result)
             batch_num += 1
 
-            # Log progress every few batches
-            if batch_num % 10 == 0 or batch_num == len(timepoint_batches):
-                progress = (batch_num / len(timepoint_batches)) * 100
-                logger.info(f"Progress: {batch_num}/{len(timepoint_batches)} batches ({progress:.1f}%)")
-
-    logger.info(f"Total heatmap records generated: {len(heatmap_records):,}")
+            # Log progress every few blocks
+            if batch_num % 10 == 0 or batch_num == len(link_blocks):
+                progress = (batch_num / len(link_blocks)) * 100
+                logger.info(f"Progress: {batch_num}/{len(link_blocks)} link blocks ({progress:.1f}%)")
+
+    # Assemble the records column-wise in one pass. Links not in the network
+    # or without center coordinates are skipped; the remaining columns are
+    # gathered by link code and timepoint position.
+    codes, record_timepoints, vehicle_counts = (np.concatenate(parts) for parts in zip(*batch_results))
+    keep = ~np.isnan(center_x[codes])
+    codes, record_timepoints, vehicle_counts = codes[keep], record_timepoints[keep], vehicle_counts[keep]
+    tp_idx = np.searchsorted(timepoints, record_timepoints)
+    heatmap_df = pd.DataFrame({
+        'link_id': np.asarray(link_ids)[codes],
+        'x': center_x[codes],
+        'y': center_y[codes],
+        'timestamp': timepoints_to_timestamps(timepoints)[tp_idx],
+        'timepoint_seconds': record_timepoints,
+        'vehicle_count': vehicle_counts,
+    })
+    logger.info(f"Total heatmap records generated: {len(heatmap_df):,}")
 
     # Setup output files
     output_paths = {}
@@ -239,58 +471,42 @@ def parquet_to_heatmap(parquet_input, link_attrs, output_base,
     for fmt, path in output_paths.items():
         logger.info(f"  {fmt}: {path}")
 
-    # Export to formats
+    # Export to formats; CSV, Parquet and GeoParquet share one Arrow table
+    if any(fmt in output_formats for fmt in ('csv', 'parquet', 'geoparquet')):
+        heatmap_table = pa.Table.from_pandas(heatmap_df, preserve_index=False)
+
     if 'geojson' in output_formats:
         logger.info("Writing GeoJSON...")
-        features = []
-        for rec in heatmap_records:
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [rec['x'], rec['y']]
-                },
-                "properties": {
-                    "link_id": rec['link_id'],
-                    "timestamp": rec['timestamp'],
-                    "timepoint_seconds": rec['timepoint_seconds'],
-                    "vehicle_count": rec['vehicle_count']
-                }
-            }
-            features.append(feature)
-
-        geojson = {
-            "type": "FeatureCollection",
-            "features": features
-        }
-
-        with open(output_paths['geojson'], 'w') as f:
-            json.dump(geojson, f)
+        with open(output_paths['geojson'], 'wb') as f:
+            f.write(FEATURE_COLLECTION_HEADER)
+            for start in range(0, len(heatmap_df), GEOJSON_BLOCK_SIZE):
+                if start > 0:
+                    f.write(FEATURE_SEPARATOR)
+                f.write(dumps_features(build_features(heatmap_df.iloc[start:start + GEOJSON_BLOCK_SIZE])))
+            f.write(FEATURE_COLLECTION_FOOTER)
         logger.success(f"GeoJSON created: {output_paths['geojson']}")
 
     if 'csv' in output_formats:
         logger.info("Writing CSV...")
-        with open(output_paths['csv'], 'w', newline='') as f:
-            writer = csv_module.writer(f)
-            writer.writerow(['link_id', 'x', 'y', 'timestamp', 'timepoint_seconds', 'vehicle_count'])
-            for rec in heatmap_records:
-                writer.writerow([rec['link_id'], rec['x'], rec['y'], rec['timestamp'],
-                               rec['timepoint_seconds'], rec['vehicle_count']])
+        pa_csv.write_csv(heatmap_table, output_paths['csv'],
+                         write_options=pa_csv.WriteOptions(quoting_style='needed'))
         logger.success(f"CSV created: {output_paths['csv']}")
 
     if 'parquet' in output_formats:
         logger.info("Writing Parquet...")
-        df_out = pd.DataFrame(heatmap_records)
-        df_out.to_parquet(output_paths['parquet'], index=False)
+        pq.write_table(heatmap_table, output_paths['parquet'])
         logger.success(f"Parquet created: {output_paths['parquet']}")
 
     if 'geoparquet' in output_formats:
         logger.info("Writing GeoParquet...")
-        df_out = pd.DataFrame(heatmap_records)
-        # Create geometry from x, y
-        geometry = [Point(row['x'], row['y']) for _, row in df_out.iterrows()]
-        gdf_out = gpd.GeoDataFrame(df_out.drop(columns=['x', 'y']), geometry=geometry, crs='EPSG:4326')
-        gdf_out.to_parquet(output_paths['geoparquet'])
+        # Replace x, y with a WKB point column and attach GeoParquet metadata
+        attributes = heatmap_table.drop_columns(['x', 'y'])
+        geo_schema = geoparquet_schema(attributes.schema.remove_metadata(), geometry_types=['Point'])
+        geo_table = pa.Table.from_arrays(
+            attributes.columns + [points_to_wkb(heatmap_df['x'].to_numpy(), heatmap_df['y'].to_numpy())],
+            schema=geo_schema
+        )
+        pq.write_table(geo_table, output_paths['geoparquet'])
         logger.success(f"GeoParquet created: {output_paths['geoparquet']}")
 
     logger.success("Heatmap export completed!")
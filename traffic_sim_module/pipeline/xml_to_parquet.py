@@ -3,12 +3,15 @@
 This module provides efficient conversion of large XML event files to Parquet format
 with simultaneous filtering by time intervals and spatial domains. Uses multiprocessing
 for parallel processing and streaming writes to handle files larger than available RAM.
+The output is sorted by time_enter with an external merge of sorted row groups, so
+memory stays bounded by the row group and merge batch sizes rather than the output size.
 
 The converter supports:
     - Multiple configurable time intervals for snapshot analysis
     - Spatial filtering using road network from GeoPackage
     - Automatic time clipping for events extending beyond interval boundaries
     - Memory-efficient streaming XML parsing
+    - Parallel parsing of byte ranges of the XML file (uncompressed input)
     - Parallel chunk processing with multiprocessing
 
 Authors: Noah Kim & Joe Beck
@@ -29,15 +32,22 @@ Example:
 """
 
 from collections import defaultdict
+import gzip
 import multiprocessing as mp
+import os
+from pathlib import Path
+import threading
 
 import geopandas as gpd
 from lxml import etree
-import pandas as pd
+import numpy as np
+from pandas.api.types import is_string_dtype
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
 from ..config import logger
+from ..utils.arrow_ipc import deserialize_batch, serialize_batch
 
 
 def load_valid_link_ids(gpkg_path, id_field='linkId'):
@@ -55,10 +65,16 @@ def load_valid_link_ids(gpkg_path, id_field='linkId'):
         >>> len(valid_links)
         45032
     """
-    logger.info("Loading road network GeoPackage...")
-    gpkg = gpd.read_file(gpkg_path)
+    logger.info("Loading road network link IDs from GeoPackage...")
+    # Only the ID column is needed: skip geometry and all other attributes
+    gpkg = gpd.read_file(gpkg_path, columns=[id_field], ignore_geometry=True)
     logger.info(f"Road network loaded: {len(gpkg):,} links")
-    return set(gpkg[id_field].astype(str))
+
+    # String IDs go into the set as they are; only other dtypes are converted
+    link_ids = gpkg[id_field]
+    if not is_string_dtype(link_ids):
+        link_ids = link_ids.astype(str)
+    return set(link_ids.to_numpy())
 
 
 def parse_time_interval(interval_str):
@@ -96,6 +112,173 @@ def time_to_seconds(time_str):
     return h * 3600 + m * 60
 
 
+# Schema of the filtered events Parquet file (link_id is dictionary-encoded)
+EVENT_SCHEMA = pa.schema([
+    ('person', pa.string()),
+    ('link_id', pa.dictionary(pa.int32(), pa.string())),
+    ('time_enter', pa.int32()),
+    ('time_leave', pa.int32()),
+    ('interval_id', pa.int32()),
+    ('event_type', pa.string())
+])
+
+
+# Schema of raw event chunks sent from the .gz parser to the filter workers
+EVENT_CHUNK_SCHEMA = pa.schema([
+    ('person', pa.string()),
+    ('link_id', pa.string()),
+    ('event_type', pa.string()),
+    ('time', pa.string())
+])
+
+
+# Event files are time-ordered, so parsing can stop after the last interval
+# end (see parse_stop_time); the time is checked every STOP_CHECK_INTERVAL
+# events
+STOP_CHECK_INTERVAL = 1000
+
+
+# Byte ranges per worker for uncompressed input; several smaller ranges per
+# worker balance the load when event density varies along the file
+RANGES_PER_WORKER = 4
+
+
+# Maximum number of rows per row group in the final filtered events file
+EVENTS_ROW_GROUP_SIZE = 1_000_000
+
+# Compression and dictionary-encoded columns of the final filtered events file
+EVENTS_COMPRESSION = 'snappy'
+EVENTS_DICTIONARY_COLUMNS = ['person', 'link_id', 'event_type']
+
+# Intermediate files (range parts, unsorted .gz output) are read back right
+# away, so they are written uncompressed in row groups of this many rows
+PART_ROW_GROUP_SIZE = 500_000
+PART_COMPRESSION = 'none'
+
+# Rows read from each sorted run at a time while merging (see merge_sorted_runs)
+MERGE_BATCH_SIZE = 65_536
+
+
+def event_sort_keys(events):
+    """Sort keys of filtered events: time_enter, then time_leave.
+
+    Both int32 times are packed into one int64 so rows can be ordered and
+    compared with plain NumPy operations.
+
+    Args:
+        events: pyarrow Table or RecordBatch with EVENT_SCHEMA
+
+    Returns:
+        int64 array with one key per row, ordered like (time_enter, time_leave)
+    """
+    time_enter = events.column('time_enter').to_numpy().astype(np.int64)
+    time_leave = events.column('time_leave').to_numpy().astype(np.int64)
+    return (time_enter << 32) + (time_leave + (1 << 31))
+
+
+class BufferedEventWriter:
+    """Write filtered event batches to Parquet in sorted row groups.
+
+    filter_events_chunk yields one small batch per chunk. Batches are
+    buffered until row_group_size rows are collected, so the file gets a few
+    large row groups instead of one tiny row group per chunk. Each row group
+    is sorted by time_enter/time_leave before it is written, which makes
+    every row group a sorted run for merge_sorted_runs. The file is only
+    created once rows are flushed.
+
+    Args:
+        path: Path of the Parquet file
+        row_group_size: Number of rows to buffer per row group
+        compression: Parquet compression codec
+        use_dictionary: Dictionary encoding setting passed to ParquetWriter
+    """
+
+    def __init__(self, path, row_group_size=PART_ROW_GROUP_SIZE, compression=PART_COMPRESSION,
+                 use_dictionary=True):
+        self.path = path
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.use_dictionary = use_dictionary
+        self.writer = None
+        self.batches = []
+        self.buffered_rows = 0
+        self.rows_written = 0
+
+    def write_batch(self, batch):
+        if not batch.num_rows:
+            return
+        self.batches.append(batch)
+        self.buffered_rows += batch.num_rows
+        if self.buffered_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batches:
+            return
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, EVENT_SCHEMA, compression=self.compression,
+                                           use_dictionary=self.use_dictionary)
+            logger.debug(f"Parquet writer initialized: {self.path}")
+        table = pa.Table.from_batches(self.batches, schema=EVENT_SCHEMA)
+        table = table.take(np.argsort(event_sort_keys(table), kind='stable'))
+        self.writer.write_table(table, row_group_size=self.buffered_rows)
+        self.rows_written += self.buffered_rows
+        self.batches = []
+        self.buffered_rows = 0
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self.writer:
+                self.writer.close()
+
+
+def assign_intervals(times, time_intervals):
+    """Find the first time interval containing each time.
+
+    Args:
+        times: Integer array of times in seconds
+        time_intervals: List of (start_seconds, end_seconds) tuples
+
+    Returns:
+        int64 array with the index into time_intervals of the first interval
+        with start <= time <= end, or -1 where no interval matches
+
+    Note:
+        Non-overlapping intervals (the normal case) are looked up with one
+        np.searchsorted over the sorted starts. Overlapping intervals fall
+        back to one vectorized pass per interval, so the first listed
+        interval still wins.
+    """
+    times = np.asarray(times)
+    starts = np.array([start for start, _ in time_intervals], dtype=np.int64)
+    ends = np.array([end for _, end in time_intervals], dtype=np.int64)
+    order = np.argsort(starts, kind='stable')
+
+    if len(starts) and np.all(starts[order][1:] > ends[order][:-1]):
+        pos = np.searchsorted(starts[order], times, side='right') - 1
+        interval_id = order[np.maximum(pos, 0)]
+        return np.where((pos >= 0) & (times <= ends[interval_id]), interval_id, -1)
+
+    interval_id = np.full(len(times), -1, dtype=np.int64)
+    for idx, (interval_start, interval_end) in enumerate(time_intervals):
+        interval_id[(interval_id < 0) & (times >= interval_start) & (times <= interval_end)] = idx
+    return interval_id
+
+
+# Event times accepted by the filter: integers, optionally written as N.0
+# (the form MATSim writes). Fractional and non-numeric times are skipped.
+INTEGER_TIME_PATTERN = r'^-?[0-9]+(\.0*)?$'
+
+
+def as_string_array(values):
+    """Return values as a pyarrow string array (Arrow arrays pass through)."""
+    if isinstance(values, pa.Array):
+        return values
+    return pa.array(values, type=pa.string())
+
+
 def filter_events_chunk(args):
     """Filter events chunk by time and spatial domain with automatic time clipping.
 
@@ -109,86 +292,299 @@ def filter_events_chunk(args):
     Args:
         args: Tuple of (valid_links, chunk, time_intervals) where:
             - valid_links (set): Set of valid link IDs as strings
-            - chunk (list): List of event dictionaries from XML
+            - chunk (tuple): Event columns (persons, links, types, times) as
+              parallel lists or pyarrow string arrays, as yielded by
+              iter_event_chunks
             - time_intervals (list): List of (start_seconds, end_seconds) tuples
 
     Returns:
-        List of filtered event dictionaries with keys:
+        pyarrow RecordBatch with EVENT_SCHEMA of filtered trips in LeaveLink
+        order with columns:
             - person (str): Person/vehicle ID
-            - link_id (str): Link ID
+            - link_id (dictionary): Link ID
             - time_enter (int): Enter time in seconds
             - time_leave (int): Leave time in seconds (possibly clipped)
             - interval_id (int): Index of the time interval this event belongs to
             - event_type (str): Always 'trip' for matched EnterLink/LeaveLink pairs
 
     Note:
-        Unmatched EnterLink events are expected in snapshot mode and logged at
-        debug level. Only complete EnterLink/LeaveLink pairs are included in output.
+        Times must be integral: '27000' and '27000.0' are both accepted,
+        while events with fractional or non-numeric times are skipped (see
+        INTEGER_TIME_PATTERN). The chunk is processed column-wise: a LeaveLink
+        pairs with the event directly before it for the same (person, link)
+        key if that event is an EnterLink, which is the same pairing as
+        tracking the latest open EnterLink per key. Unmatched EnterLink events
+        are expected in snapshot mode and logged at debug level. Only complete
+        EnterLink/LeaveLink pairs are included in output.
     """
     valid_links, chunk, time_intervals = args
+    persons, links, types, times = (as_string_array(column) for column in chunk)
+
+    # Events without a person, a link, or a valid integer time are ignored entirely
+    usable = pc.and_(pc.fill_null(pc.match_substring_regex(times, INTEGER_TIME_PATTERN), False),
+                     pc.and_(pc.is_valid(persons), pc.is_valid(links)))
+    rows = np.flatnonzero(usable.to_numpy(zero_copy_only=False))
+    time = pc.cast(pc.replace_substring_regex(times.take(rows), r'\.0*$', ''),
+                   pa.int32()).to_numpy()
+
+    # Dense per-chunk codes for persons and links, combined into one key
+    person_codes = pc.dictionary_encode(persons.take(rows)).indices.to_numpy()
+    links = pc.dictionary_encode(links.take(rows))
+    link_codes = links.indices.to_numpy()
+    key = person_codes.astype(np.int64) * max(len(links.dictionary), 1) + link_codes
+    event_types = types.take(rows)
+    is_enter = pc.equal(event_types, 'EnterLink').to_numpy(zero_copy_only=False)
+    is_leave = pc.equal(event_types, 'LeaveLink').to_numpy(zero_copy_only=False)
+
+    # Group events by key, keeping chunk order within a key; an event's
+    # predecessor for the same key is then its left neighbour
+    order = np.argsort(key, kind='stable')
+    same_key = key[order][1:] == key[order][:-1]
+    pair_end = same_key & is_enter[order][:-1] & is_leave[order][1:]
+
+    unmatched = int(is_enter.sum() - pair_end.sum())
+    if unmatched:
+        logger.debug(f"{unmatched} unmatched EnterLink events in chunk (expected for snapshot mode)")
+
+    # Trips in LeaveLink order: (enter row, leave row) per pair
+    leave_pos = np.flatnonzero(pair_end) + 1
+    trip_order = np.argsort(order[leave_pos])
+    leave_rows = order[leave_pos][trip_order]
+    enter_rows = order[leave_pos - 1][trip_order]
+
+    # Times are int32 like the output schema, so the clip below runs on
+    # twice as many lanes per SIMD instruction as int64 would
+    time_enter = time[enter_rows]
+    time_leave = time[leave_rows]
+
+    interval_id = assign_intervals(time_enter, time_intervals)
+
+    # The set lookup runs once per distinct link
+    valid_mask = np.fromiter((link_id in valid_links for link_id in links.dictionary.to_pylist()),
+                             dtype=bool, count=len(links.dictionary))
+    link_codes = link_codes[leave_rows]
+
+    # Keep trips in an interval and in the spatial domain
+    keep = (interval_id >= 0) & valid_mask[link_codes]
+
+    interval_id = interval_id[keep].astype(np.int32)
+    interval_ends = np.array([end for _, end in time_intervals], dtype=np.int32)
+
+    # Clip LeaveLink time to interval end if it extends beyond (branchless
+    # minimum); time_leave might now equal time_enter, which just means the
+    # vehicle was at a point in the snapshot
+    time_leave = np.minimum(time_leave[keep], interval_ends.take(interval_id))
+
+    return pa.record_batch([
+        persons.take(rows[leave_rows[keep]]),
+        pa.DictionaryArray.from_arrays(link_codes[keep].astype(np.int32), links.dictionary),
+        pa.array(time_enter[keep], type=pa.int32()),
+        pa.array(time_leave, type=pa.int32()),
+        pa.array(interval_id, type=pa.int32()),
+        pa.repeat(pa.scalar('trip'), len(interval_id)),
+    ], schema=EVENT_SCHEMA)
+
+
+# Per-worker filter state, set once by init_filter_worker instead of being
+# pickled with every chunk
+_worker_valid_links = None
+_worker_time_intervals = None
+
+
+def init_filter_worker(valid_links, time_intervals):
+    """Initialize per-worker state for filter_worker_chunk.
+
+    Used as the multiprocessing Pool initializer so the valid link set and
+    the time intervals are transferred once per worker rather than with
+    every chunk.
 
-    filtered_records = []
-    enter_events = {}
+    Args:
+        valid_links: Set of valid link IDs as strings
+        time_intervals: List of (start_seconds, end_seconds) tuples
+    """
+    global _worker_valid_links, _worker_time_intervals
+    _worker_valid_links = valid_links
+    _worker_time_intervals = time_intervals
 
-    for event in chunk:
-        event_type = event.get('type')
-        person = event.get('person')
-        time_str = event.get('time')
 
-        if not time_str:
-            continue
+def filter_worker_chunk(chunk_buffer):
+    """Filter one event chunk with the state set by init_filter_worker.
 
+    Args:
+        chunk_buffer: Arrow IPC stream of one event chunk, as yielded by
+            parse_xml_to_chunks
+
+    Returns:
+        Arrow IPC stream buffer of the filtered trips RecordBatch (see
+        filter_events_chunk)
+    """
+    chunk = deserialize_batch(chunk_buffer).columns
+    return serialize_batch(filter_events_chunk((_worker_valid_links, chunk, _worker_time_intervals)))
+
+
+def parse_stop_time(time_intervals):
+    """Time after which no further EnterLink can start a filtered trip.
+
+    Trips are assigned by their EnterLink time, so nothing entering after the
+    last interval end is kept. EnterLinks inside an interval still need their
+    LeaveLink, which may come much later (e.g. a vehicle parked on the link
+    during an activity), so parsing only stops once none of them is waiting
+    (see waiting_enter_keys).
+
+    Args:
+        time_intervals: List of (start_seconds, end_seconds) tuples
+
+    Returns:
+        Stop time in seconds, or None if there are no intervals
+    """
+    if not time_intervals:
+        return None
+    return max(end for _, end in time_intervals)
+
+
+def waiting_enter_keys(pending_events, time_intervals):
+    """Find buffered EnterLink events that fall inside a time interval.
+
+    Args:
+        pending_events: Dict of (person, link) -> list of unmatched EnterLink
+            event tuples, as filled by iter_event_chunks
+        time_intervals: List of (start_seconds, end_seconds) tuples
+
+    Returns:
+        Set of (person, link) keys whose latest EnterLink is inside an
+        interval and so still needs its LeaveLink
+    """
+    waiting = set()
+    for key, events in pending_events.items():
         try:
-            time = int(time_str)
+            time = float(events[-1][3])
         except ValueError:
             continue
+        if any(start <= time <= end for start, end in time_intervals):
+            waiting.add(key)
+    return waiting
+
+
+def iterparse_events(source):
+    """Iterate over the <event> elements of an XML source with lxml.
+
+    Event files are plain, trusted-format XML: entity resolution, ID
+    collection, blank text and comments are skipped, and very large
+    documents are allowed.
+
+    Args:
+        source: Path or file-like object with the XML events
+
+    Returns:
+        lxml iterparse context yielding ("end", element) pairs
+    """
+    return etree.iterparse(source, events=("end",), tag="event", huge_tree=True,
+                           remove_blank_text=True, remove_comments=True,
+                           resolve_entities=False, collect_ids=False, no_network=True)
 
-        link_id = event.get('link')
-
-        if event_type == "EnterLink":
-            enter_events[(person, link_id)] = event
-        elif event_type == "LeaveLink" and (person, link_id) in enter_events:
-            enter_event = enter_events.pop((person, link_id))
-            time_enter = int(enter_event.get('time'))
-            time_leave = time
-
-            # Check which interval the EnterLink falls into
-            matched_interval = None
-            interval_id = None
-            for idx, (interval_start, interval_end) in enumerate(time_intervals):
-                if interval_start <= time_enter <= interval_end:
-                    matched_interval = (interval_start, interval_end)
-                    interval_id = idx  # Track which interval this belongs to
-                    break
-
-            # If EnterLink is in an interval and link is in spatial domain
-            if matched_interval and link_id in valid_links:
-                interval_start, interval_end = matched_interval
-
-                # Clip LeaveLink time to interval end if it extends beyond
-                if time_leave > interval_end:
-                    time_leave = interval_end
-                    # Note: time_leave might now equal time_enter, which is fine
-                    # It just means the vehicle was at a point in the snapshot
-
-                # Store the filtered record with potentially clipped time_leave
-                filtered_records.append({
-                    'person': person,
-                    'link_id': link_id,
-                    'time_enter': time_enter,
-                    'time_leave': time_leave,
-                    'interval_id': interval_id,  # NEW: Track which interval
-                    'event_type': 'trip'
-                })
-
-    if enter_events:
-        logger.debug(f"{len(enter_events)} unmatched EnterLink events in chunk (expected for snapshot mode)")
-
-    return filtered_records
-
-
-def parse_xml_to_chunks(xml_path, queue, chunk_size):
-    """Parse XML event file and send chunks to processing queue.
+
+def iter_event_chunks(source, chunk_size, pending_events, orphan_leaves=None,
+                      valid_links=None, time_intervals=None, parse_state=None):
+    """Stream paired EnterLink/LeaveLink events from an XML source in chunks.
+
+    Buffers each EnterLink event until its matching LeaveLink is found, so a
+    chunk always contains both events of a pair. If valid_links is given,
+    link events outside the spatial domain are dropped before pairing, so
+    they are never buffered or sent to the filter workers.
+
+    Only the end of each <event> element is handled, and events are kept as
+    (person, link, type, time) tuples instead of attribute dictionaries.
+    Chunks are yielded column-wise (struct of arrays).
+
+    Args:
+        source: Path or file-like object with the XML events
+        chunk_size: Number of events per chunk
+        pending_events: Dict of (person, link) -> list of unmatched EnterLink
+            event tuples; updated in place and left holding the unmatched events
+        orphan_leaves: Optional list collecting LeaveLink event tuples without
+            a buffered EnterLink (needed to stitch byte ranges back together)
+        valid_links: Optional set of valid link IDs as strings
+        time_intervals: Optional list of (start_seconds, end_seconds) tuples;
+            since event files are time-ordered, parsing stops once it is past
+            parse_stop_time and no EnterLink inside an interval is still
+            waiting for its LeaveLink
+        parse_state: Optional dict; parse_state['stopped'] is set to True if
+            parsing stopped before the end of the source
+
+    Yields:
+        Tuples of parallel lists (persons, links, types, times)
+    """
+    context = iterparse_events(source)
+    stop_time = parse_stop_time(time_intervals)
+    # Keys of EnterLinks inside an interval still waiting for their LeaveLink
+    # once parsing is past stop_time (None before that)
+    waiting = None
+
+    persons, links, types, times = [], [], [], []
+
+    for parsed, (_, elem) in enumerate(context):
+        event_type = elem.get("type", "")
+        time_str = elem.get("time")
+
+        if (waiting is None and stop_time is not None
+                and parsed % STOP_CHECK_INTERVAL == 0 and time_str):
+            try:
+                past_stop_time = float(time_str) > stop_time
+            except ValueError:
+                past_stop_time = False
+            if past_stop_time:
+                waiting = waiting_enter_keys(pending_events, time_intervals)
+                logger.debug(f"Reached {time_str}s, past the last interval; "
+                             f"{len(waiting):,} EnterLink events still waiting for a LeaveLink")
+        if waiting is not None and not waiting:
+            if parse_state is not None:
+                parse_state['stopped'] = True
+            break
+
+        # Events without a time can never be paired; skip them here so they
+        # neither enter a chunk nor release buffered EnterLinks early
+        if (event_type == "EnterLink" or event_type == "LeaveLink") and time_str:
+            person_id = elem.get("person", "")
+            link_id = elem.get("link", "")
+
+            if valid_links is None or link_id in valid_links:
+                key = (person_id, link_id)
+                event = (person_id, link_id, event_type, time_str)
+
+                if event_type == "EnterLink":
+                    pending_events[key].append(event)
+                else:
+                    if key in pending_events:
+                        for person, link, etype, time in pending_events.pop(key):
+                            persons.append(person)
+                            links.append(link)
+                            types.append(etype)
+                            times.append(time)
+                        if waiting:
+                            waiting.discard(key)
+                    elif orphan_leaves is not None:
+                        orphan_leaves.append(event)
+                    persons.append(person_id)
+                    links.append(link_id)
+                    types.append(event_type)
+                    times.append(time_str)
+
+        # Memory cleanup
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+        # Send chunk when full
+        if len(persons) >= chunk_size:
+            yield persons, links, types, times
+            persons, links, types, times = [], [], [], []
+
+    if persons:
+        yield persons, links, types, times
+
+
+def parse_xml_to_chunks(xml_path, chunk_size, valid_links=None, time_intervals=None):
+    """Parse XML event file and yield chunks for processing.
 
     Uses streaming XML parsing (iterparse) to handle large files efficiently without
     loading the entire file into memory. Ensures proper EnterLink/LeaveLink pairing
@@ -196,133 +592,528 @@ def parse_xml_to_chunks(xml_path, queue, chunk_size):
 
     Args:
         xml_path: Path to the XML events file
-        queue: Multiprocessing queue to send event chunks
         chunk_size: Number of events per chunk
+        valid_links: Optional set of valid link IDs; events on other links
+            are dropped during parsing
+        time_intervals: Optional list of (start_seconds, end_seconds) tuples
+            used to stop parsing early (see iter_event_chunks)
+
+    Yields:
+        Arrow IPC stream buffers, one per chunk, of a RecordBatch with the
+        string columns of EVENT_CHUNK_SCHEMA. Sending one contiguous buffer
+        to a worker is much cheaper than pickling the column lists.
 
     Note:
-        - Sends None to queue when parsing is complete (sentinel value)
         - Clears parsed elements from memory to prevent accumulation
         - Logs progress every 10 chunks
         - Warns about unmatched EnterLink events at end of file
     """
     logger.info("Starting XML parsing...")
-    context = etree.iterparse(xml_path, events=("start", "end"))
 
-    event_list = []
     pending_events = defaultdict(list)
     total_events = 0
     chunks_sent = 0
 
-    for event, elem in context:
-        if event == "end" and elem.tag == "event":
-            event_dict = dict(elem.attrib)
+    source = gzip.open(xml_path, 'rb') if str(xml_path).endswith('.gz') else xml_path
+
+    for chunk in iter_event_chunks(source, chunk_size, pending_events,
+                                   valid_links=valid_links, time_intervals=time_intervals):
+        yield serialize_batch(pa.record_batch(
+            [pa.array(column, type=pa.string()) for column in chunk],
+            schema=EVENT_CHUNK_SCHEMA))
+        total_events += len(chunk[0])
+        chunks_sent += 1
+        if chunks_sent % 10 == 0:  # Log every 10 chunks
+            logger.info(f"Parsed {total_events:,} events ({chunks_sent} chunks sent)")
+
+    # Handle remaining events
+    if pending_events:
+        logger.warning(f"{len(pending_events)} unmatched EnterLink events at end of file")
+
+    logger.success(f"XML parsing complete: {total_events:,} total events processed")
+
+
+class ByteRangeReader:
+    """File-like reader over a byte range of an events XML file.
 
-            event_type = event_dict.get("type", "")
-            person_id = event_dict.get("person", "")
-            link_id = event_dict.get("link", "")
+    Wraps the range in a synthetic ``<events>`` root element so that lxml can
+    parse it as a standalone document. The range must start and end on
+    ``<event`` element boundaries (see find_event_offsets).
 
-            key = (person_id, link_id)
+    Args:
+        xml_path: Path to the XML events file
+        start: First byte of the range
+        end: Byte offset where the range stops (exclusive)
+    """
+
+    def __init__(self, xml_path, start, end):
+        self._file = open(xml_path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+        self._prefix = b'<events>'
+        self._suffix = b'</events>'
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._remaining + len(self._prefix) + len(self._suffix)
+
+        data = b''
+        if self._prefix:
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            size -= len(data)
+
+        if size > 0 and self._remaining > 0:
+            chunk = self._file.read(min(size, self._remaining))
+            self._remaining -= len(chunk)
+            if not chunk:
+                self._remaining = 0
+            data += chunk
+            size -= len(chunk)
+
+        if size > 0 and self._remaining == 0 and self._suffix:
+            tail, self._suffix = self._suffix[:size], self._suffix[size:]
+            data += tail
+
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def _find_next(f, offset, pattern, block_size=1 << 16):
+    """Return the offset of the first occurrence of pattern at or after offset."""
+    f.seek(offset)
+    carry = b''
+    base = offset
+    while True:
+        block = f.read(block_size)
+        if not block:
+            return None
+        data = carry + block
+        pos = data.find(pattern)
+        if pos >= 0:
+            return base + pos
+        carry = data[-(len(pattern) - 1):]
+        base += len(data) - len(carry)
+
+
+def find_event_offsets(xml_path, num_ranges):
+    """Split an events XML file into byte ranges aligned on ``<event`` tags.
+
+    Args:
+        xml_path: Path to the (uncompressed) XML events file
+        num_ranges: Desired number of ranges
+
+    Returns:
+        List of (start, end) byte offsets covering all <event> elements.
+        May contain fewer than num_ranges entries for small files.
+    """
+    size = os.stat(xml_path).st_size
 
-            if event_type == "EnterLink":
-                pending_events[key].append(event_dict)
-            elif event_type == "LeaveLink":
-                if key in pending_events:
-                    event_list.extend(pending_events.pop(key))
-                event_list.append(event_dict)
+    with open(xml_path, 'rb') as f:
+        first = _find_next(f, 0, b'<event ')
+        if first is None:
+            return []
+
+        # The closing root tag marks the end of the last range
+        tail_start = max(first, size - (1 << 16))
+        f.seek(tail_start)
+        close_pos = f.read().rfind(b'</events>')
+        last = tail_start + close_pos if close_pos >= 0 else size
+
+        boundaries = [first]
+        for i in range(1, num_ranges):
+            target = max(boundaries[-1] + 1, first + (last - first) * i // num_ranges)
+            pos = _find_next(f, target, b'<event ')
+            if pos is None or pos >= last:
+                break
+            boundaries.append(pos)
+        boundaries.append(last)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def parse_xml_range(args):
+    """Parse, pair, and filter the events of one byte range of the XML file.
+
+    Worker function for the parallel XML reader. Filtered events are written to
+    a Parquet part file; events that may pair up with events from a neighbouring
+    range are returned so the caller can stitch them together.
+
+    Args:
+        args: Tuple of (xml_path, start, end, part_path, valid_links,
+            time_intervals, chunk_size)
+
+    Returns:
+        Tuple of (records_written, orphan_leaves, pending_enters, stopped) where:
+            - records_written (int): Number of filtered events in the part file
+            - orphan_leaves (list): LeaveLink events whose EnterLink precedes the range
+            - pending_enters (list): EnterLink events still unmatched at the range end
+            - stopped (bool): Whether parsing stopped after the last interval
+              before the range end (see iter_event_chunks)
+    """
+    xml_path, start, end, part_path, valid_links, time_intervals, chunk_size = args
+
+    pending_events = defaultdict(list)
+    orphan_leaves = []
+    parse_state = {'stopped': False}
+    writer = BufferedEventWriter(part_path)
+
+    reader = ByteRangeReader(xml_path, start, end)
+    try:
+        for chunk in iter_event_chunks(reader, chunk_size, pending_events, orphan_leaves,
+                                       valid_links, time_intervals, parse_state):
+            writer.write_batch(filter_events_chunk((valid_links, chunk, time_intervals)))
+    finally:
+        reader.close()
+        writer.close()
+
+    pending_enters = [event for events in pending_events.values() for event in events]
+    return writer.rows_written, orphan_leaves, pending_enters, parse_state['stopped']
+
+
+def find_leave_events(args):
+    """Find the first LeaveLink event of each of the given keys in a byte range.
+
+    Worker function for the second pass of the parallel XML reader over
+    ranges whose parse stopped after the last interval (see
+    write_ranges_to_parquet).
+
+    Args:
+        args: Tuple of (xml_path, start, end, keys), where keys is a set of
+            (person, link) keys
+
+    Returns:
+        Dict of (person, link) -> first LeaveLink event tuple for that key
+        in the range
+    """
+    xml_path, start, end, keys = args
+
+    keys = set(keys)
+    found = {}
+
+    reader = ByteRangeReader(xml_path, start, end)
+    try:
+        for _, elem in iterparse_events(reader):
+            time_str = elem.get("time")
+            if elem.get("type") == "LeaveLink" and time_str:
+                key = (elem.get("person", ""), elem.get("link", ""))
+                if key in keys:
+                    found[key] = (*key, "LeaveLink", time_str)
+                    keys.discard(key)
+                    if not keys:
+                        break
 
-            # Memory cleanup
             elem.clear()
             while elem.getprevious() is not None:
                 del elem.getparent()[0]
+    finally:
+        reader.close()
 
-            # Send chunk when full
-            if len(event_list) >= chunk_size:
-                queue.put(event_list)
-                total_events += len(event_list)
-                chunks_sent += 1
-                if chunks_sent % 10 == 0:  # Log every 10 chunks
-                    logger.info(f"Parsed {total_events:,} events ({chunks_sent} chunks sent)")
-                event_list = []
+    return found
 
-    # Handle remaining events
-    if pending_events:
-        logger.warning(f"{len(pending_events)} unmatched EnterLink events at end of file")
 
-    if event_list:
-        queue.put(event_list)
-        total_events += len(event_list)
+def stitch_range_boundaries(range_results):
+    """Pair EnterLink/LeaveLink events that straddle byte-range boundaries.
 
-    queue.put(None)
-    logger.success(f"XML parsing complete: {total_events:,} total events processed")
+    Replays the boundary events of each range in file order, exactly as the
+    sequential parser would have buffered them.
+
+    Args:
+        range_results: Per-range (orphan_leaves, pending_enters) in file order
+
+    Returns:
+        Tuple of (paired_events, pending_events), where paired_events is a
+        list of (person, link, type, time) event tuples and pending_events
+        maps (person, link) to the EnterLink event tuples left unmatched
+    """
+    pending_events = defaultdict(list)
+    paired_events = []
 
+    for orphan_leaves, pending_enters in range_results:
+        for event in orphan_leaves:
+            key = event[:2]
+            if key in pending_events:
+                paired_events.extend(pending_events.pop(key))
+                paired_events.append(event)
+        for event in pending_enters:
+            pending_events[event[:2]].append(event)
 
-def write_to_parquet(output_path, pool, queue, valid_links, time_intervals):
+    return paired_events, pending_events
+
+
+def write_to_parquet(output_path, pool, chunks, time_intervals, max_in_flight):
     """Process event chunks in parallel and write results to Parquet file.
 
     Coordinates parallel filtering of event chunks using a multiprocessing pool,
     then writes the filtered results to a Parquet file with streaming writes.
     Uses PyArrow for efficient columnar storage.
 
+    The pool's task handler thread pulls chunks straight from the chunks
+    iterator, so parsing runs in this process alongside the workers and each
+    chunk is pickled only once, on its way to a worker.
+
     Args:
         output_path: Path for the output Parquet file
-        pool: Multiprocessing pool for parallel processing
-        queue: Queue containing event chunks to process
-        valid_links: Set of valid link IDs for spatial filtering
+        pool: Multiprocessing pool initialized with init_filter_worker
+        chunks: Iterator of event chunks, e.g. from parse_xml_to_chunks
         time_intervals: List of (start_seconds, end_seconds) tuples
+        max_in_flight: Maximum number of chunks parsed but not yet written,
+            which bounds memory use
 
     Note:
         - Schema is predefined with appropriate types for all columns
-        - Writes are streaming to handle large datasets
+        - Writes are streaming to handle large datasets; the file is an
+          uncompressed intermediate that sort_parquet_by_time rewrites
         - Logs progress every 50 batches
         - Ensures writer is properly closed even if errors occur
     """
     logger.info("Filtering events and writing to Parquet...")
     logger.info(f"Using {len(time_intervals)} time intervals")
 
-    # Define schema
-    schema = pa.schema([
-        ('person', pa.string()),
-        ('link_id', pa.string()),
-        ('time_enter', pa.int32()),
-        ('time_leave', pa.int32()),
-        ('interval_id', pa.int32()),
-        ('event_type', pa.string())
-    ])
-
-    writer = None
+    writer = BufferedEventWriter(output_path)
     total_filtered = 0
     batches_written = 0
+    in_flight = threading.Semaphore(max_in_flight)
+    stop_reading = threading.Event()
+    parse_errors = []
+
+    # Parse errors are kept here and re-raised below: the pool would send
+    # them through a worker, and lxml errors cannot be pickled
+    def bounded_chunks():
+        try:
+            for chunk in chunks:
+                while not in_flight.acquire(timeout=0.1):
+                    if stop_reading.is_set():
+                        return
+                yield chunk
+        except Exception as e:
+            parse_errors.append(e)
 
     try:
-        for records in pool.imap_unordered(
-            filter_events_chunk,
-            ((valid_links, chunk, time_intervals)
-             for chunk in iter(queue.get, None))
-        ):
-            if records:
-                df = pd.DataFrame(records)
-                table = pa.Table.from_pandas(df, schema=schema)
-
-                if writer is None:
-                    writer = pq.ParquetWriter(output_path, schema)
-                    logger.debug(f"Parquet writer initialized: {output_path}")
-
-                writer.write_table(table)
-                total_filtered += len(records)
+        for records_buffer in pool.imap_unordered(filter_worker_chunk, bounded_chunks(), chunksize=1):
+            in_flight.release()
+            records = deserialize_batch(records_buffer)
+            if records.num_rows:
+                writer.write_batch(records)
+                total_filtered += records.num_rows
                 batches_written += 1
 
                 if batches_written % 50 == 0:  # Log every 50 batches
                     logger.info(f"Filtered events written: {total_filtered:,}")
 
+        if parse_errors:
+            raise parse_errors[0]
+
+    finally:
+        stop_reading.set()
+        writer.close()
+
+    logger.success(f"Parquet file created: {total_filtered:,} filtered events")
+
+
+def write_ranges_to_parquet(xml_input, output_path, valid_links, time_intervals,
+                            num_workers, chunk_size, mp_context=None):
+    """Parse byte ranges of the XML file in parallel and merge into one Parquet file.
+
+    Splits the XML file into num_workers * RANGES_PER_WORKER byte ranges
+    aligned on <event> tags. Workers pick up ranges one at a time and parse,
+    pair, and filter each into its own Parquet part file of sorted row
+    groups, so Parquet encoding and sorting of the bulk of the data also run
+    in parallel. EnterLink/LeaveLink pairs crossing a range boundary are
+    stitched in the main process. Ranges after the last interval end stop
+    early (see iter_event_chunks); EnterLinks inside an interval that are
+    still unmatched then get their LeaveLink from a second pass over those
+    ranges (see find_leave_events). Finally, all sorted row groups are streamed
+    through a k-way merge into output_path (see merge_sorted_runs), so the
+    main process never holds the whole filtered result in memory.
+
+    Args:
+        xml_input: Path to the uncompressed XML events file
+        output_path: Path for the output Parquet file
+        valid_links: Set of valid link IDs for spatial filtering
+        time_intervals: List of (start_seconds, end_seconds) tuples
+        num_workers: Number of worker processes
+        chunk_size: Number of events per filtering chunk within a worker
+        mp_context: Optional multiprocessing context (default: platform default)
+
+    Note:
+        Assumes EnterLink/LeaveLink events alternate per (person, link), as in
+        MATSim event files.
+    """
+    if mp_context is None:
+        mp_context = mp.get_context()
+
+    ranges = find_event_offsets(xml_input, num_workers * RANGES_PER_WORKER)
+    logger.info(f"Parsing XML in {len(ranges)} parallel byte ranges...")
+
+    output_path = Path(output_path)
+    part_paths = [output_path.with_suffix(f".part{i}.parquet") for i in range(len(ranges))]
+    tasks = [
+        (xml_input, start, end, str(part_path), valid_links, time_intervals, chunk_size)
+        for (start, end), part_path in zip(ranges, part_paths)
+    ]
+
+    total_filtered = 0
+
+    try:
+        with mp_context.Pool(max(1, min(num_workers, len(tasks)))) as pool:
+            results = pool.map(parse_xml_range, tasks, chunksize=1)
+
+            # Pair events that straddle range boundaries
+            boundary_events, pending_events = stitch_range_boundaries(
+                (orphan_leaves, pending_enters) for _, orphan_leaves, pending_enters, _ in results
+            )
+
+            # EnterLinks inside an interval may still be waiting for a
+            # LeaveLink in a range that stopped early. Every such range comes
+            # after all of these EnterLinks, so the first LeaveLink found in
+            # file order completes the pair.
+            waiting = waiting_enter_keys(pending_events, time_intervals)
+            stopped_ranges = [(start, end) for (start, end), (*_, stopped)
+                              in zip(ranges, results) if stopped]
+            if waiting and stopped_ranges:
+                logger.info(f"Looking up LeaveLink events of {len(waiting):,} EnterLink events "
+                            f"in {len(stopped_ranges)} ranges after the last interval...")
+                found = pool.map(find_leave_events,
+                                 [(xml_input, start, end, waiting)
+                                  for start, end in stopped_ranges], chunksize=1)
+                for leave_events in found:
+                    for key, event in leave_events.items():
+                        if key in pending_events:
+                            boundary_events.extend(pending_events.pop(key))
+                            boundary_events.append(event)
+
+        if pending_events:
+            logger.warning(f"{len(pending_events)} unmatched EnterLink events at end of file")
+        boundary_chunk = tuple(map(list, zip(*boundary_events))) or ([], [], [], [])
+        boundary_records = filter_events_chunk((valid_links, boundary_chunk, time_intervals))
+
+        # Merge the sorted row groups of all parts and the boundary pairs
+        # into the final sorted output
+        runs = [run
+                for part_path, (records_written, *_) in zip(part_paths, results)
+                if records_written
+                for run in iter_row_group_runs(part_path)]
+        if boundary_records.num_rows:
+            order = np.argsort(event_sort_keys(boundary_records), kind='stable')
+            runs.append([boundary_records.take(order)])
+        logger.info("Merging sorted part files by time_enter...")
+        total_filtered = merge_sorted_runs(runs, output_path)
+
     finally:
-        if writer:
-            writer.close()
+        for part_path in part_paths:
+            part_path.unlink(missing_ok=True)
 
     logger.success(f"Parquet file created: {total_filtered:,} filtered events")
 
 
+def iter_row_group_runs(path, batch_size=MERGE_BATCH_SIZE):
+    """Open every row group of a file written by BufferedEventWriter as a run.
+
+    Args:
+        path: Path of a Parquet file whose row groups are each sorted
+        batch_size: Number of rows read from a run at a time
+
+    Returns:
+        List of RecordBatch iterators, one per row group
+    """
+    parquet_file = pq.ParquetFile(path)
+    return [parquet_file.iter_batches(batch_size=batch_size, row_groups=[i])
+            for i in range(parquet_file.metadata.num_row_groups)]
+
+
+def merge_sorted_runs(runs, path, row_group_size=EVENTS_ROW_GROUP_SIZE):
+    """Merge sorted runs of filtered events into one sorted Parquet file.
+
+    External k-way merge: each run is read batch by batch. In every step,
+    all buffered rows up to the smallest "last key" among the runs' buffers
+    are safe to emit, since no run can still produce a smaller key; they are
+    sorted and written, and exhausted buffers are refilled. Memory therefore
+    stays at about one batch per run plus one output row group, independent
+    of the total number of filtered events.
+
+    Sorted output gives every row group a narrow time_enter range, so readers
+    can skip row groups outside a time window using the min/max statistics
+    (see parquet_to_heatmap).
+
+    Args:
+        runs: Iterables of RecordBatches with EVENT_SCHEMA, each sorted by
+            time_enter, then time_leave
+        path: Path of the output Parquet file
+        row_group_size: Maximum number of rows per output row group
+
+    Returns:
+        Number of rows written (no file is created if all runs are empty)
+    """
+    runs = [iter(run) for run in runs]
+    buffers = {}
+
+    def refill(i):
+        for batch in runs[i]:
+            if batch.num_rows:
+                buffers[i] = (pa.Table.from_batches([batch]), event_sort_keys(batch))
+                return
+        buffers.pop(i, None)
+
+    for i in range(len(runs)):
+        refill(i)
+
+    writer = BufferedEventWriter(path, row_group_size, EVENTS_COMPRESSION,
+                                 use_dictionary=EVENTS_DICTIONARY_COLUMNS)
+    try:
+        while buffers:
+            bound = min(keys[-1] for _, keys in buffers.values())
+            tables, key_parts = [], []
+            for i, (table, keys) in list(buffers.items()):
+                n = np.searchsorted(keys, bound, side='right')
+                tables.append(table.slice(0, n))
+                key_parts.append(keys[:n])
+                if n == len(keys):
+                    refill(i)
+                else:
+                    buffers[i] = (table.slice(n), keys[n:])
+
+            merged = pa.concat_tables(tables)
+            if not merged.num_rows:
+                raise ValueError("merge_sorted_runs: input runs are not sorted")
+            merged = merged.take(np.argsort(np.concatenate(key_parts), kind='stable'))
+            for batch in merged.to_batches():
+                writer.write_batch(batch)
+    finally:
+        writer.close()
+
+    return writer.rows_written
+
+
+def sort_parquet_by_time(path, row_group_size=EVENTS_ROW_GROUP_SIZE):
+    """Rewrite a filtered events Parquet file sorted by time_enter.
+
+    The file must have been written by BufferedEventWriter, so that each row
+    group is already sorted; the row groups are then merged with
+    merge_sorted_runs.
+
+    Args:
+        path: Path of the filtered events Parquet file (rewritten in place;
+            a missing file, i.e. no filtered events, is left as is)
+        row_group_size: Maximum number of rows per row group
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+
+    logger.info("Sorting filtered events by time_enter...")
+    sorted_path = path.with_suffix('.sorted.parquet')
+    try:
+        merge_sorted_runs(iter_row_group_runs(path), sorted_path, row_group_size)
+        os.replace(sorted_path, path)
+    finally:
+        sorted_path.unlink(missing_ok=True)
+
+
 def xml_to_parquet_filtered(xml_input, valid_links, parquet_output,
-                            time_intervals, num_workers, chunk_size, gpkg_network=None):
+                            time_intervals, num_workers, chunk_size, gpkg_network=None,
+                            mp_context=None):
     """Convert XML events file to filtered Parquet format with parallel processing.
 
     Main entry point for the XML to Parquet conversion pipeline. Orchestrates
@@ -330,6 +1121,11 @@ def xml_to_parquet_filtered(xml_input, valid_links, parquet_output,
     both time-based and spatial filtering with automatic time clipping for
     snapshot-based analysis.
 
+    Uncompressed XML files are split into byte ranges that are parsed in
+    parallel. Compressed files (e.g. .xml.gz) cannot be split, so they are
+    parsed by a single streaming parser in this process feeding the worker
+    pool.
+
     Args:
         xml_input: Path to input XML events file
         valid_links: Set of valid link IDs as strings, or None to load from gpkg_network
@@ -338,6 +1134,8 @@ def xml_to_parquet_filtered(xml_input, valid_links, parquet_output,
         num_workers: Number of parallel worker processes for filtering
         chunk_size: Number of events to process per chunk
         gpkg_network: Optional path to GeoPackage for loading valid link IDs
+        mp_context: Optional multiprocessing context used for all worker
+            processes (default: platform default start method)
 
     Raises:
         ValueError: If both valid_links and gpkg_network are None
@@ -345,7 +1143,10 @@ def xml_to_parquet_filtered(xml_input, valid_links, parquet_output,
     Note:
         For snapshot-based filtering, LeaveLink times are automatically clipped to
         the interval end if they extend beyond it. This ensures trajectories stay
-        within the snapshot window for proper interpolation.
+        within the snapshot window for proper interpolation. The output is
+        sorted by time_enter (see sort_parquet_by_time). Parsing stops after
+        the last interval end once no EnterLink inside an interval is still
+        waiting for its LeaveLink.
 
     Example:
         >>> time_intervals = [(28800, 32400), (61200, 64800)]  # 8-9am, 5-6pm
@@ -366,23 +1167,27 @@ def xml_to_parquet_filtered(xml_input, valid_links, parquet_output,
             raise ValueError("Either valid_links or gpkg_network must be provided")
         valid_links = load_valid_link_ids(gpkg_network)
 
-    # Setup multiprocessing
-    queue = mp.Queue(maxsize=num_workers * 4)
-    pool = mp.Pool(num_workers)
-
-    # Start parser process
-    parser = mp.Process(target=parse_xml_to_chunks,
-                       args=(xml_input, queue, chunk_size))
-    parser.start()
-
-    # Process and write to Parquet
-    write_to_parquet(parquet_output, pool, queue, valid_links, time_intervals)
-    
-    # Cleanup
-    pool.close()
-    pool.join()
-    parser.join()
-    
+    if mp_context is None:
+        mp_context = mp.get_context()
+
+    stop_time = parse_stop_time(time_intervals)
+    if stop_time is not None:
+        logger.info(f"Parsing stops after {stop_time}s once no EnterLink inside an interval "
+                    "is waiting for its LeaveLink")
+
+    if not str(xml_input).endswith('.gz'):
+        write_ranges_to_parquet(xml_input, parquet_output, valid_links, time_intervals,
+                                num_workers, chunk_size, mp_context)
+    else:
+        # Parse in this process and filter in the pool
+        with mp_context.Pool(num_workers, initializer=init_filter_worker,
+                             initargs=(valid_links, time_intervals)) as pool:
+            chunks = parse_xml_to_chunks(xml_input, chunk_size, valid_links, time_intervals)
+            write_to_parquet(parquet_output, pool, chunks, time_intervals,
+                             max_in_flight=num_workers * 4)
+
+        sort_parquet_by_time(parquet_output)
+
     print(f"Output saved to: {parquet_output}")
 
 
@@ -0,0 +1,41 @@
+"""
+Arrow IPC helpers for passing record batches between processes.
+
+A batch is sent as a self-contained IPC stream (schema, dictionaries and
+data), which is much cheaper to (de)serialize than pickling the equivalent
+Python lists and works for dictionary-encoded columns.
+"""
+import pyarrow as pa
+
+
+def serialize_batch(batch: pa.RecordBatch) -> pa.Buffer:
+    """
+    Serialize a RecordBatch as a self-contained Arrow IPC stream.
+
+    Unlike RecordBatch.serialize, the stream carries the schema and any
+    dictionaries (e.g. a dictionary-encoded link_id column), so the receiver
+    can read it without further context.
+
+    Args:
+        batch: pyarrow RecordBatch to serialize
+
+    Returns:
+        pyarrow Buffer holding the IPC stream
+    """
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue()
+
+
+def deserialize_batch(buffer) -> pa.RecordBatch:
+    """
+    Read a RecordBatch written by serialize_batch.
+
+    Args:
+        buffer: IPC stream buffer (pyarrow Buffer or bytes)
+
+    Returns:
+        The deserialized pyarrow RecordBatch
+    """
+    return pa.ipc.open_stream(buffer).read_next_batch()
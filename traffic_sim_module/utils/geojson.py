@@ -0,0 +1,37 @@
+"""
+GeoJSON writing utilities.
+
+Serializes GeoJSON features in blocks so large FeatureCollections can be
+streamed to disk without building the whole document in memory. Uses orjson
+when installed and falls back to the standard library json module.
+"""
+import json
+
+# Use orjson for fast GeoJSON serialization if available
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
+# Opening and closing bytes of a streamed FeatureCollection; features inside
+# are separated by FEATURE_SEPARATOR
+FEATURE_COLLECTION_HEADER = b'{"type": "FeatureCollection", "features": [\n'
+FEATURE_COLLECTION_FOOTER = b'\n]}'
+FEATURE_SEPARATOR = b',\n'
+
+
+def dumps_features(features, separator=FEATURE_SEPARATOR):
+    """
+    Serialize GeoJSON features into one bytes fragment.
+
+    Args:
+        features: List of GeoJSON feature dictionaries
+        separator: Bytes placed between features (b',\\n' inside a
+            FeatureCollection, b'\\n' for newline-delimited GeoJSON)
+
+    Returns:
+        Bytes with one JSON object per feature, joined by separator
+    """
+    if orjson is not None:
+        return separator.join([orjson.dumps(feature) for feature in features])
+    return separator.join([json.dumps(feature).encode() for feature in features])
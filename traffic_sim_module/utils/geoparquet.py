@@ -0,0 +1,60 @@
+"""
+GeoParquet writing utilities.
+
+Builds GeoParquet output directly with pyarrow: point geometries are encoded
+as a WKB binary column and the GeoParquet 'geo' metadata is attached to the
+schema, so output can be streamed batch by batch without materializing a
+GeoDataFrame.
+"""
+import json
+
+import numpy as np
+import pyarrow as pa
+from pyproj import CRS
+import shapely
+
+GEOPARQUET_VERSION = "1.0.0"
+
+
+def geoparquet_schema(schema: pa.Schema, crs: str = "EPSG:4326",
+                      geometry_types: list[str] | None = None) -> pa.Schema:
+    """
+    Append a WKB geometry column and GeoParquet metadata to a schema.
+
+    Args:
+        schema: Arrow schema of the attribute columns
+        crs: Coordinate reference system of the geometries (default: EPSG:4326)
+        geometry_types: Geometry types present, e.g. ['Point'] (default: unspecified)
+
+    Returns:
+        Arrow schema with a trailing binary 'geometry' field and 'geo' metadata
+    """
+    geo = {
+        "version": GEOPARQUET_VERSION,
+        "primary_column": "geometry",
+        "columns": {
+            "geometry": {
+                "encoding": "WKB",
+                "geometry_types": geometry_types or [],
+                "crs": CRS.from_user_input(crs).to_json_dict(),
+            }
+        },
+    }
+    metadata = dict(schema.metadata or {})
+    metadata[b"geo"] = json.dumps(geo).encode()
+    return schema.append(pa.field("geometry", pa.binary())).with_metadata(metadata)
+
+
+def points_to_wkb(x, y) -> pa.Array:
+    """
+    Encode point coordinates as a WKB binary array.
+
+    Args:
+        x: Array of x coordinates (longitude)
+        y: Array of y coordinates (latitude)
+
+    Returns:
+        pyarrow binary array with one 2D WKB point per coordinate pair
+    """
+    points = shapely.points(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    return pa.array(shapely.to_wkb(points, output_dimension=2), type=pa.binary())
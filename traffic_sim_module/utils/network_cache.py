@@ -3,15 +3,59 @@ Network cache utilities for fast loading of road network data.
 
 Converts GeoPackage to Parquet format for 10-50x faster loading.
 """
+from dataclasses import dataclass
 from pathlib import Path
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 from shapely import wkb
 
 from ..config import logger
 
 
+@dataclass
+class LinkSoA:
+    """
+    Struct-of-arrays view of link attributes for vectorized lookups.
+
+    All arrays are indexed by a dense integer link code, so per-event values
+    can be gathered with a single fancy-indexing operation.
+
+    Attributes:
+        link_id_to_code: Mapping of link_id (str) → dense int code
+        start_x, start_y: Travel start coordinates (float64)
+        end_x, end_y: Travel end coordinates (float64)
+        bearing: Travel bearing in degrees (int64)
+        freespeed: Link free-flow speed, NaN if not in the network (float64)
+        length: Link length, NaN if not in the network (float64)
+    """
+    link_id_to_code: dict[str, int]
+    start_x: np.ndarray
+    start_y: np.ndarray
+    end_x: np.ndarray
+    end_y: np.ndarray
+    bearing: np.ndarray
+    freespeed: np.ndarray
+    length: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start_x)
+
+    def lookup_codes(self, link_ids) -> np.ndarray:
+        """
+        Map link IDs to dense codes.
+
+        Args:
+            link_ids: Iterable of link IDs (str)
+
+        Returns:
+            Int64 array of codes, -1 for links not in the network
+        """
+        return np.array([self.link_id_to_code.get(link_id, -1) for link_id in link_ids],
+                        dtype=np.int64)
+
+
 def get_cache_path(gpkg_path: str | Path) -> Path:
     """
     Generate cache file path from GeoPackage path.
@@ -172,6 +216,86 @@ def load_network_cached(gpkg_path: str | Path, force_refresh: bool = False) -> p
     return load_network_from_cache(cache_path)
 
 
+def calculate_bearings(start_coords, end_coords) -> np.ndarray:
+    """
+    Calculate bearings for many coordinate pairs at once.
+
+    Uses the haversine formula for the initial bearing, applied to whole
+    arrays of start/end coordinates (calculate_bearing in
+    parquet_to_animation is the scalar wrapper).
+
+    Args:
+        start_coords: Array-like of shape (N, 2) with start coordinates
+        end_coords: Array-like of shape (N, 2) with end coordinates
+
+    Returns:
+        Integer array of N bearings in degrees (0-360)
+    """
+    start = np.radians(np.asarray(start_coords, dtype=np.float64).reshape(-1, 2))
+    end = np.radians(np.asarray(end_coords, dtype=np.float64).reshape(-1, 2))
+    lat1, lon1 = start[:, 0], start[:, 1]
+    lat2, lon2 = end[:, 0], end[:, 1]
+
+    delta_lon = lon2 - lon1
+    x = np.cos(lat2) * np.sin(delta_lon)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(delta_lon)
+
+    return np.round((np.degrees(np.arctan2(x, y)) + 360) % 360).astype(np.int64)
+
+
+def get_edge_coords(link_id, geom) -> tuple:
+    """
+    Extract the first and last coordinates of a link geometry.
+
+    Args:
+        link_id: Link ID (used for warnings only)
+        geom: Shapely LineString or MultiLineString, or None
+
+    Returns:
+        Tuple of (first_coord, last_coord) as (x, y) tuples, or (None, None)
+        if the geometry is missing or unsupported
+
+    Note:
+        For MultiLineString, uses the first coordinate of the first segment
+        and the last coordinate of the last segment.
+    """
+    if geom is None:
+        return None, None
+
+    try:
+        if geom.geom_type == 'LineString':
+            return geom.coords[0], geom.coords[-1]
+        if geom.geom_type == 'MultiLineString':
+            return geom.geoms[0].coords[0], geom.geoms[-1].coords[-1]
+        logger.warning(f"Link {link_id}: Unexpected geometry type {geom.geom_type}, skipping")
+    except Exception as e:
+        logger.warning(f"Link {link_id}: Error extracting coordinates: {e}, skipping")
+
+    return None, None
+
+
+def build_node_index(link_attrs: dict) -> tuple[dict, dict]:
+    """
+    Build node→links inverted indexes for O(degree) neighbor lookups.
+
+    Args:
+        link_attrs: Dictionary mapping link_id → attributes with 'from'/'to' nodes
+
+    Returns:
+        Tuple of (from_node_links, to_node_links), each mapping a node ID to
+        the list of link IDs starting (resp. ending) at that node, in
+        link_attrs order
+    """
+    from_node_links = {}
+    to_node_links = {}
+
+    for link_id, attrs in link_attrs.items():
+        from_node_links.setdefault(attrs.get('from'), []).append(link_id)
+        to_node_links.setdefault(attrs.get('to'), []).append(link_id)
+
+    return from_node_links, to_node_links
+
+
 def build_link_attributes_dict(network_df: pd.DataFrame,
                                link_id_col: str = 'linkId',
                                precompute_endpoints: bool = True) -> dict:
@@ -188,10 +312,10 @@ def build_link_attributes_dict(network_df: pd.DataFrame,
 
     Returns:
         Dictionary mapping link_id (str) → attributes
+        Always includes 'first_coord'/'last_coord' (None for missing or
+        unsupported geometries).
         If precompute_endpoints=True, includes 'travel_start', 'travel_end', 'bearing'
     """
-    import math
-
     logger.info("Building link attributes dictionary...")
 
     # IMPORTANT: Convert link IDs to strings for consistency with parquet data
@@ -208,50 +332,27 @@ def build_link_attributes_dict(network_df: pd.DataFrame,
     df_indexed = network_df.set_index(link_id_col)
     link_attrs = df_indexed.to_dict('index')
 
+    # Cache first/last geometry coordinates as plain tuples
+    for link_id, attrs in link_attrs.items():
+        attrs['first_coord'], attrs['last_coord'] = get_edge_coords(link_id, attrs.get('geometry'))
+
     if precompute_endpoints:
         logger.info("Precomputing travel endpoints and bearings for all links...")
 
         # Build node→links lookup (much faster than repeated searches)
-        from_node_links = {}
-        to_node_links = {}
-
-        for link_id, attrs in link_attrs.items():
-            from_node = attrs.get('from')
-            to_node = attrs.get('to')
-
-            if from_node not in from_node_links:
-                from_node_links[from_node] = []
-            from_node_links[from_node].append(link_id)
-
-            if to_node not in to_node_links:
-                to_node_links[to_node] = []
-            to_node_links[to_node].append(link_id)
+        from_node_links, to_node_links = build_node_index(link_attrs)
 
         # Precompute for each link
+        precomputed = []
         for link_id, attrs in link_attrs.items():
             geom = attrs.get('geometry')
-            if geom is None:
+            ec1, ec2 = attrs['first_coord'], attrs['last_coord']
+            if ec1 is None:
                 continue
 
             from_node = attrs.get('from')
             to_node = attrs.get('to')
 
-            # Get edge coordinates (handle both LINESTRING and MULTILINESTRING)
-            try:
-                if geom.geom_type == 'LineString':
-                    ec1 = geom.coords[0]
-                    ec2 = geom.coords[-1]
-                elif geom.geom_type == 'MultiLineString':
-                    # Use first coord of first segment and last coord of last segment
-                    ec1 = geom.geoms[0].coords[0]
-                    ec2 = geom.geoms[-1].coords[-1]
-                else:
-                    logger.warning(f"Link {link_id}: Unexpected geometry type {geom.geom_type}, skipping")
-                    continue
-            except Exception as e:
-                logger.warning(f"Link {link_id}: Error extracting coordinates: {e}, skipping")
-                continue
-
             # Find previous link (connects to from_node)
             # Previous link: ends at current link's from_node
             previous_link = None
@@ -271,36 +372,20 @@ def build_link_attributes_dict(network_df: pd.DataFrame,
                         break
 
             # Determine travel endpoints
-            if previous_link and previous_link in link_attrs:
-                prev_geom = link_attrs[previous_link].get('geometry')
-                if prev_geom:
-                    ef1, ef2 = prev_geom.coords[0], prev_geom.coords[-1]
-                else:
-                    ef1, ef2 = ec1, ec1
-            else:
-                ef1, ef2 = ec1, ec1
-
-            if next_link and next_link in link_attrs:
-                next_geom = link_attrs[next_link].get('geometry')
-                if next_geom:
-                    et1, et2 = next_geom.coords[0], next_geom.coords[-1]
-                else:
-                    et1, et2 = ec2, ec2
-            else:
-                et1, et2 = ec2, ec2
+            ef1, ef2 = ec1, ec1
+            if previous_link and link_attrs[previous_link]['first_coord'] is not None:
+                ef1 = link_attrs[previous_link]['first_coord']
+                ef2 = link_attrs[previous_link]['last_coord']
+
+            et1, et2 = ec2, ec2
+            if next_link and link_attrs[next_link]['first_coord'] is not None:
+                et1 = link_attrs[next_link]['first_coord']
+                et2 = link_attrs[next_link]['last_coord']
 
             # Determine actual travel start/end
             travel_start = ef1 if ec1 == ef1 else (ef2 if ec1 == ef2 else ec1)
             travel_end = et1 if ec2 == et1 else (et2 if ec2 == et2 else ec2)
 
-            # Calculate bearing
-            lat1, lon1 = map(math.radians, travel_start)
-            lat2, lon2 = map(math.radians, travel_end)
-            delta_lon = lon2 - lon1
-            x = math.cos(lat2) * math.sin(delta_lon)
-            y = math.cos(lat1) * math.sin(lat2) - math.sin(lat1) * math.cos(lat2) * math.cos(delta_lon)
-            bearing = round((math.degrees(math.atan2(x, y)) + 360) % 360)
-
             # Calculate center point (for heatmaps)
             try:
                 center_point = geom.interpolate(0.5, normalized=True)
@@ -312,8 +397,17 @@ def build_link_attributes_dict(network_df: pd.DataFrame,
             # Store precomputed values
             attrs['travel_start'] = travel_start
             attrs['travel_end'] = travel_end
-            attrs['bearing'] = bearing
             attrs['center'] = link_center
+            precomputed.append(attrs)
+
+        # Calculate bearings for all links in one vectorized pass
+        if precomputed:
+            bearings = calculate_bearings(
+                [attrs['travel_start'] for attrs in precomputed],
+                [attrs['travel_end'] for attrs in precomputed]
+            )
+            for attrs, bearing in zip(precomputed, bearings.tolist()):
+                attrs['bearing'] = bearing
 
         logger.success(f"Precomputed endpoints, bearings, and centers for {len(link_attrs):,} links")
 
@@ -321,3 +415,70 @@ def build_link_attributes_dict(network_df: pd.DataFrame,
     logger.debug(f"Sample link IDs (first 5): {list(link_attrs.keys())[:5]}")
 
     return link_attrs
+
+
+def build_link_soa(link_attrs: dict, resolve_endpoints=None) -> LinkSoA:
+    """
+    Convert a link attributes dictionary into a LinkSoA.
+
+    Uses the travel endpoints and bearings precomputed by
+    build_link_attributes_dict. Links without precomputed endpoints are
+    resolved in one call to resolve_endpoints, if given, and their bearings
+    are computed with calculate_bearings.
+
+    Args:
+        link_attrs: Dictionary mapping link_id (str) → attributes
+        resolve_endpoints: Optional callable taking a list of link IDs and
+            returning a dict of link_id → (travel_start, travel_end)
+
+    Returns:
+        LinkSoA covering every link whose endpoints are known
+
+    Note:
+        Links whose endpoints cannot be resolved are left out of
+        link_id_to_code, so their events are reported as not found.
+    """
+    missing = [link_id for link_id, attrs in link_attrs.items()
+               if attrs.get('travel_start') is None or attrs.get('travel_end') is None]
+    resolved = resolve_endpoints(missing) if missing and resolve_endpoints else {}
+    if len(resolved) < len(missing):
+        logger.warning(f"{len(missing) - len(resolved):,} links have no travel endpoints, skipping")
+
+    link_ids, starts, ends, bearings, freespeeds, lengths = [], [], [], [], [], []
+    for link_id, attrs in link_attrs.items():
+        if link_id in resolved:
+            start, end = resolved[link_id]
+            bearing = None
+        else:
+            start = attrs.get('travel_start')
+            end = attrs.get('travel_end')
+            bearing = attrs.get('bearing')
+            if start is None or end is None:
+                continue
+
+        link_ids.append(link_id)
+        starts.append(start)
+        ends.append(end)
+        bearings.append(bearing)
+        freespeeds.append(attrs.get('freespeed', np.nan))
+        lengths.append(attrs.get('length', np.nan))
+
+    starts = np.array(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.array(ends, dtype=np.float64).reshape(-1, 2)
+
+    # Fill in bearings for links resolved above
+    bearing_arr = np.array([-1 if b is None else b for b in bearings], dtype=np.int64)
+    needs_bearing = bearing_arr < 0
+    if needs_bearing.any():
+        bearing_arr[needs_bearing] = calculate_bearings(starts[needs_bearing], ends[needs_bearing])
+
+    return LinkSoA(
+        link_id_to_code={link_id: code for code, link_id in enumerate(link_ids)},
+        start_x=starts[:, 0].copy(),
+        start_y=starts[:, 1].copy(),
+        end_x=ends[:, 0].copy(),
+        end_y=ends[:, 1].copy(),
+        bearing=bearing_arr,
+        freespeed=np.array(freespeeds, dtype=np.float64),
+        length=np.array(lengths, dtype=np.float64),
+    )